@@ -3,12 +3,25 @@
 Quick test script to solve a game with AI assistance
 """
 
+import re
 import sys
-import json
 from pathlib import Path
 from zwalker.zmachine import ZMachine
 from zwalker.walker import GameWalker
 from zwalker.ai_assist import AIAssistant, create_context_from_walker
+from zwalker._util import write_json
+
+# Output that means the game is over, won or lost
+END_RE = re.compile(r"you have died|you have won|the end|\*\*\* you have|congratulations",
+                    re.IGNORECASE)
+
+
+def write_report(lines):
+    """Write buffered report lines to stdout in a single call and clear them."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        lines.clear()
 
 
 def solve_game(game_path, max_iterations=50, use_real_ai=False):
@@ -47,72 +60,79 @@ def solve_game(game_path, max_iterations=50, use_real_ai=False):
 
     # Solve iteratively
     for iteration in range(max_iterations):
-        print(f"\n{'='*60}")
-        print(f"ITERATION {iteration + 1}")
-        print(f"{'='*60}")
-
-        # Get current context
-        context = create_context_from_walker(walker)
-        print(f"Room: {context.room_name} (ID: {context.room_id})")
-        print(f"Inventory: {', '.join(context.inventory) if context.inventory else 'empty'}")
-        print(f"Exits: {', '.join(context.exits.keys()) if context.exits else 'none'}")
-        print(f"Objects: {', '.join(context.visible_objects) if context.visible_objects else 'none'}")
-
-        rooms_visited.add(context.room_id)
-
-        # Check for game over/completion
-        recent_output = context.recent_outputs[-1] if context.recent_outputs else ""
-        if any(marker in recent_output.lower() for marker in
-               ['you have died', 'you have won', 'the end', '*** you have', 'congratulations']):
-            print(f"\n🎉 GAME COMPLETE! Ending detected.")
-            break
-
-        # Get AI analysis
-        print(f"\nAI analyzing...")
-        response = ai.analyze(context)
-        print(f"Priority: {response.exploration_priority}")
-        if response.possible_puzzles:
-            print(f"Puzzles detected: {response.possible_puzzles}")
-        print(f"Suggested commands: {response.suggested_commands[:10]}")
-
-        # Try suggested commands
-        command_tried = False
-        for cmd in response.suggested_commands[:5]:
-            print(f"\n> {cmd}")
-            result = walker.try_command(cmd)
-
-            output_text = result.output
-            print(output_text[:300] + ("..." if len(output_text) > 300 else ""))
-
-            # Track successful command
-            if result.new_room or result.interesting or result.took_object:
-                solution_commands.append({
-                    'command': cmd,
-                    'from_room': context.room_id,
-                    'to_room': walker.current_room_id,
-                    'result': 'moved' if result.new_room else 'interesting'
-                })
-                command_tried = True
-
-                if result.new_room:
-                    print(f"✓ Moved to new room!")
-                    break
-                elif result.interesting:
-                    print(f"✓ Something interesting happened!")
-
-        if not command_tried:
-            # Try basic exploration
-            print(f"\nNo interesting AI suggestions. Trying basic directions...")
-            for direction in ['north', 'south', 'east', 'west', 'up', 'down']:
-                result = walker.try_command(direction)
-                if result.new_room:
+        # Buffer this iteration's report and write it in one go; whatever
+        # is pending still gets written if the iteration raises
+        out = []
+        emit = out.append
+        try:
+            emit(f"\n{'='*60}")
+            emit(f"ITERATION {iteration + 1}")
+            emit(f"{'='*60}")
+
+            # Get current context
+            context = create_context_from_walker(walker)
+            emit(f"Room: {context.room_name} (ID: {context.room_id})")
+            emit(f"Inventory: {', '.join(context.inventory) if context.inventory else 'empty'}")
+            emit(f"Exits: {', '.join(context.exits.keys()) if context.exits else 'none'}")
+            emit(f"Objects: {', '.join(context.visible_objects) if context.visible_objects else 'none'}")
+
+            rooms_visited.add(context.room_id)
+
+            # Check for game over/completion
+            recent_output = context.recent_outputs[-1] if context.recent_outputs else ""
+            if END_RE.search(recent_output):
+                emit(f"\n🎉 GAME COMPLETE! Ending detected.")
+                break
+
+            # Get AI analysis
+            emit(f"\nAI analyzing...")
+            write_report(out)       # Show progress before the (slow) analysis
+            response = ai.analyze(context)
+            emit(f"Priority: {response.exploration_priority}")
+            if response.possible_puzzles:
+                emit(f"Puzzles detected: {response.possible_puzzles}")
+            emit(f"Suggested commands: {response.suggested_commands[:10]}")
+
+            # Try suggested commands
+            command_tried = False
+            for cmd in response.suggested_commands[:5]:
+                emit(f"\n> {cmd}")
+                result = walker.try_command(cmd)
+
+                output_text = result.output
+                emit(output_text[:300] + ("..." if len(output_text) > 300 else ""))
+
+                # Track successful command
+                if result.new_room or result.interesting or result.took_object:
                     solution_commands.append({
-                        'command': direction,
+                        'command': cmd,
                         'from_room': context.room_id,
-                        'to_room': walker.current_room_id
+                        'to_room': walker.current_room_id,
+                        'result': 'moved' if result.new_room else 'interesting'
                     })
-                    print(f"✓ {direction} -> room {walker.current_room_id}")
-                    break
+                    command_tried = True
+
+                    if result.new_room:
+                        emit(f"✓ Moved to new room!")
+                        break
+                    elif result.interesting:
+                        emit(f"✓ Something interesting happened!")
+
+            if not command_tried:
+                # Try basic exploration
+                emit(f"\nNo interesting AI suggestions. Trying basic directions...")
+                for direction in ['north', 'south', 'east', 'west', 'up', 'down']:
+                    result = walker.try_command(direction)
+                    if result.new_room:
+                        solution_commands.append({
+                            'command': direction,
+                            'from_room': context.room_id,
+                            'to_room': walker.current_room_id
+                        })
+                        emit(f"✓ {direction} -> room {walker.current_room_id}")
+                        break
+        finally:
+            write_report(out)
 
     # Results
     print(f"\n{'='*60}")
@@ -135,7 +155,7 @@ def solve_game(game_path, max_iterations=50, use_real_ai=False):
     }
 
     output_file = Path(game_path).stem + '_solution.json'
-    Path(output_file).write_text(json.dumps(walkthrough, indent=2))
+    write_json(output_file, walkthrough)
     print(f"\n✓ Solution saved to: {output_file}")
 
     return walkthrough
@@ -8,12 +8,18 @@ This script:
 3. Compiles each game with z2js
 4. Compares outputs to find bugs
 
-Usage: python solve_top5.py [--max-iterations N] [--no-ai]
+Games are solved in parallel worker processes.
+
+Usage: python solve_top5.py [--max-iterations N] [--no-ai] [--jobs N]
 """
 
+import os
 import sys
 import json
 import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
@@ -30,11 +36,19 @@ TOP_5_GAMES = [
 ]
 
 
-def compile_with_z2js(game_path):
-    """Compile a game with z2js"""
+Z2JS_TIMEOUT = 120  # seconds, counted from when the compile starts
+
+
+def start_z2js(game_path):
+    """Start compiling a game with z2js in the background.
+
+    Returns a (process, output_js, start_time, stderr_file) handle for
+    finish_z2js, or None if z2js could not be launched. stderr goes to a
+    temp file rather than a pipe, since nothing reads it until the AI
+    solve is over and a full pipe would stall the compiler.
+    """
     game_name = Path(game_path).stem
     output_js = f"z2js_output/{game_name}.js"
-    output_html = f"z2js_output/{game_name}.html"
 
     # Create output directory
     Path("z2js_output").mkdir(exist_ok=True)
@@ -45,18 +59,39 @@ def compile_with_z2js(game_path):
     abs_game_path = Path(game_path).absolute()
     abs_output_js = Path(output_js).absolute()
 
+    stderr_file = tempfile.TemporaryFile(mode="w+")
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ["python", "-m", "jsgen", str(abs_game_path), "-o", str(abs_output_js)],
             cwd=str(z2js_dir),
-            capture_output=True,
-            text=True,
-            timeout=120
+            stdout=subprocess.DEVNULL,
+            stderr=stderr_file,
+            text=True
         )
+    except Exception as e:
+        stderr_file.close()
+        print(f"  ✗ Z2JS error: {e}")
+        return None
+    return proc, output_js, time.monotonic(), stderr_file
+
 
-        if result.returncode != 0:
+def finish_z2js(handle):
+    """Wait for a compile started by start_z2js and report the result."""
+    if handle is None:
+        return None
+    proc, output_js, started, stderr_file = handle
+
+    try:
+        # A compile that already finished during the solve is never timed out
+        if proc.poll() is None:
+            remaining = max(0.0, Z2JS_TIMEOUT - (time.monotonic() - started))
+            proc.wait(timeout=remaining)
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+
+        if proc.returncode != 0:
             print(f"  ✗ Z2JS compilation failed:")
-            print(f"    {result.stderr[:500]}")
+            print(f"    {stderr[:500]}")
             return None
 
         if Path(output_js).exists():
@@ -68,11 +103,83 @@ def compile_with_z2js(game_path):
             return None
 
     except subprocess.TimeoutExpired:
-        print(f"  ✗ Z2JS compilation timed out (>120s)")
+        proc.kill()
+        proc.wait()
+        print(f"  ✗ Z2JS compilation timed out (>{Z2JS_TIMEOUT}s)")
         return None
     except Exception as e:
         print(f"  ✗ Z2JS error: {e}")
         return None
+    finally:
+        stderr_file.close()
+
+
+def compile_with_z2js(game_path):
+    """Compile a game with z2js"""
+    return finish_z2js(start_z2js(game_path))
+
+
+def solve_and_compile(game_path, name, rank, max_iterations, use_real_ai):
+    """Solve one game with AI, then compile it with z2js.
+
+    Runs in a worker process, so it only takes and returns picklable data.
+    The z2js compile does not depend on the walkthrough, so it is started
+    first and runs alongside the AI solve.
+    """
+    print(f"[{name}] Starting z2js compile in the background...")
+    z2js = start_z2js(game_path)
+
+    # Step 1: Solve with AI
+    print(f"[{name}] STEP 1: Generating walkthrough with AI...")
+
+    try:
+        walkthrough = solve_game(
+            game_path,
+            max_iterations=max_iterations,
+            use_real_ai=use_real_ai
+        )
+
+        solution_file = Path(game_path).stem + "_solution.json"
+
+        result_entry = {
+            "game": name,
+            "path": game_path,
+            "rank": rank,
+            "solution_file": solution_file,
+            "rooms_visited": len(walkthrough.get("rooms_visited", [])),
+            "commands": len(walkthrough.get("solution_commands", [])),
+            "status": "walkthrough_generated"
+        }
+
+        print(f"\n✓ [{name}] Walkthrough generated: {solution_file}")
+        print(f"  Rooms visited: {result_entry['rooms_visited']}")
+        print(f"  Commands: {result_entry['commands']}")
+
+    except Exception as e:
+        print(f"\n✗ [{name}] Walkthrough generation failed: {e}")
+        result_entry = {
+            "game": name,
+            "path": game_path,
+            "status": "walkthrough_failed",
+            "error": str(e)
+        }
+
+    # Step 2: Collect the z2js compile
+    print(f"\n[{name}] STEP 2: Waiting for z2js...")
+
+    try:
+        js_file = finish_z2js(z2js)
+        if js_file:
+            result_entry["z2js_file"] = js_file
+            result_entry["z2js_status"] = "compiled"
+        else:
+            result_entry["z2js_status"] = "failed"
+    except Exception as e:
+        print(f"  ✗ Z2JS compilation error: {e}")
+        result_entry["z2js_status"] = "error"
+        result_entry["z2js_error"] = str(e)
+
+    return result_entry
 
 
 def main():
@@ -84,13 +191,14 @@ def main():
                        help="Use local heuristics instead of Claude")
     parser.add_argument("--games", nargs="+", type=int, choices=[1,2,3,4,5],
                        help="Solve only specific games (1-5)")
+    parser.add_argument("--jobs", type=int, default=None,
+                       help="Games to solve in parallel (default: one per game, up to CPU count)")
     args = parser.parse_args()
 
     use_real_ai = not args.no_ai
 
     # Check for API key if using real AI
     if use_real_ai:
-        import os
         if not os.environ.get("ANTHROPIC_API_KEY"):
             print("ERROR: ANTHROPIC_API_KEY not set. Use --no-ai for local heuristics.")
             return 1
@@ -103,91 +211,61 @@ def main():
     print(f"Timestamp: {datetime.now().isoformat()}")
     print()
 
-    results = []
-
     # Filter games if specific ones requested
     games_to_solve = TOP_5_GAMES
     if args.games:
         games_to_solve = [TOP_5_GAMES[i-1] for i in args.games]
 
-    for i, (game_path, name, rank) in enumerate(games_to_solve, 1):
-        print(f"\n{'='*70}")
-        print(f"GAME {i}/{len(games_to_solve)}: {name} ({rank})")
-        print(f"File: {game_path}")
-        print(f"{'='*70}\n")
-
-        if not Path(game_path).exists():
-            print(f"✗ Game file not found: {game_path}")
-            results.append({
-                "game": name,
-                "path": game_path,
-                "status": "not_found"
-            })
-            continue
-
-        # Step 1: Solve with AI
-        print(f"STEP 1: Generating walkthrough with AI...")
-        print("-" * 70)
-
-        try:
-            walkthrough = solve_game(
-                game_path,
-                max_iterations=args.max_iterations,
-                use_real_ai=use_real_ai
-            )
-
-            solution_file = Path(game_path).stem + "_solution.json"
-
-            result_entry = {
-                "game": name,
-                "path": game_path,
-                "rank": rank,
-                "solution_file": solution_file,
-                "rooms_visited": len(walkthrough.get("rooms_visited", [])),
-                "commands": len(walkthrough.get("solution_commands", [])),
-                "status": "walkthrough_generated"
-            }
-
-            print(f"\n✓ Walkthrough generated: {solution_file}")
-            print(f"  Rooms visited: {result_entry['rooms_visited']}")
-            print(f"  Commands: {result_entry['commands']}")
-
-        except Exception as e:
-            print(f"\n✗ Walkthrough generation failed: {e}")
-            result_entry = {
-                "game": name,
-                "path": game_path,
-                "status": "walkthrough_failed",
-                "error": str(e)
-            }
-
-        # Step 2: Compile with z2js
-        print(f"\nSTEP 2: Compiling with z2js...")
-        print("-" * 70)
-
-        try:
-            js_file = compile_with_z2js(game_path)
-            if js_file:
-                result_entry["z2js_file"] = js_file
-                result_entry["z2js_status"] = "compiled"
-            else:
-                result_entry["z2js_status"] = "failed"
-        except Exception as e:
-            print(f"  ✗ Z2JS compilation error: {e}")
-            result_entry["z2js_status"] = "error"
-            result_entry["z2js_error"] = str(e)
-
-        results.append(result_entry)
-
-        # Save progress after each game
-        progress_file = "top5_progress.json"
+    # Games are independent (separate walker, separate z2js subprocess), so
+    # solve them in parallel. Results are keyed by position to keep the
+    # summary in list order; progress is only written from this process.
+    by_index = {}
+    progress_file = "top5_progress.json"
+
+    def save_progress():
         Path(progress_file).write_text(json.dumps({
             "timestamp": datetime.now().isoformat(),
             "ai_mode": "claude" if use_real_ai else "local",
             "max_iterations": args.max_iterations,
-            "results": results
+            "results": [by_index[i] for i in sorted(by_index)]
         }, indent=2))
 
+    workers = args.jobs or min(len(games_to_solve), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {}
+        for i, (game_path, name, rank) in enumerate(games_to_solve, 1):
+            if not Path(game_path).exists():
+                print(f"✗ Game file not found: {game_path}")
+                by_index[i] = {
+                    "game": name,
+                    "path": game_path,
+                    "status": "not_found"
+                }
+                continue
+            print(f"GAME {i}/{len(games_to_solve)}: {name} ({rank}) - {game_path}")
+            future = pool.submit(solve_and_compile, game_path, name, rank,
+                                 args.max_iterations, use_real_ai)
+            futures[future] = i
+
+        for future in as_completed(futures):
+            i = futures[future]
+            game_path, name, _ = games_to_solve[i - 1]
+            try:
+                by_index[i] = future.result()
+            except Exception as e:
+                print(f"\n✗ {name} worker failed: {e}")
+                by_index[i] = {
+                    "game": name,
+                    "path": game_path,
+                    "status": "walkthrough_failed",
+                    "error": str(e)
+                }
+            # Save progress after each game
+            save_progress()
+
+    save_progress()
+    results = [by_index[i] for i in sorted(by_index)]
+
     # Final summary
     print(f"\n\n{'='*70}")
     print("FINAL SUMMARY")
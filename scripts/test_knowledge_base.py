@@ -31,24 +31,27 @@ def find_test_game():
         return str(zork)
 
     # Look for common test games
-    for pattern in ["*.z3", "*.z5", "*.z8"]:
-        games = list(games_dir.glob(pattern))
-        if games:
-            return str(games[0])
+    if games_dir.is_dir():
+        for pattern in ["*.z3", "*.z5", "*.z8"]:
+            first = next(games_dir.glob(pattern), None)
+            if first is not None:
+                return str(first)
 
     # Try parent games directory
     games_dir = Path(__file__).parent.parent / "games"
-    for pattern in ["*.z3", "*.z5", "*.z8"]:
-        games = list(games_dir.glob(pattern))
-        if games:
-            return str(games[0])
+    if games_dir.is_dir():
+        for pattern in ["*.z3", "*.z5", "*.z8"]:
+            first = next(games_dir.glob(pattern), None)
+            if first is not None:
+                return str(first)
 
     # Try tests directory
     tests_dir = Path(__file__).parent.parent / "tests"
-    for pattern in ["*.z3", "*.z5", "*.z8"]:
-        games = list(tests_dir.glob(pattern))
-        if games:
-            return str(games[0])
+    if tests_dir.is_dir():
+        for pattern in ["*.z3", "*.z5", "*.z8"]:
+            first = next(tests_dir.glob(pattern), None)
+            if first is not None:
+                return str(first)
 
     return None
 
@@ -67,24 +70,27 @@ def test_knowledge_base_standalone():
     print(f"Started run #{run_num}")
 
     # Add some rooms
-    kb.add_room(1, "West of House", "You are standing in an open field...")
-    kb.add_room(2, "North of House", "You are facing the north side...")
-    kb.add_room(3, "Behind House", "You are behind the white house...")
+    kb.add_rooms_bulk([
+        (1, "West of House", "You are standing in an open field..."),
+        (2, "North of House", "You are facing the north side..."),
+        (3, "Behind House", "You are behind the white house..."),
+    ])
 
     # Add exits
-    kb.add_exit(1, "north", 2)
-    kb.add_exit(2, "south", 1)
-    kb.add_exit(2, "east", 3)
-    kb.add_exit(3, "west", 2)
+    kb.add_exits_bulk([
+        (1, "north", 2),
+        (2, "south", 1),
+        (2, "east", 3),
+        (3, "west", 2),
+    ])
 
     # Add objects
-    obj1 = kb.add_object(100, "mailbox", 1)
-    obj1.is_takeable = False
+    obj1, obj2 = kb.add_objects_bulk([
+        (100, "mailbox", 1, False),
+        (101, "leaflet", 1, True),
+    ])
     obj1.is_container = True
 
-    obj2 = kb.add_object(101, "leaflet", 1)
-    obj2.is_takeable = True
-
     # Record some actions
     kb.record_action("open mailbox", "Opening the small mailbox reveals a leaflet.",
                      room_id=1, result_type="success")
@@ -130,6 +136,38 @@ def test_knowledge_base_standalone():
     return True
 
 
+def test_distances_from_goal():
+    """Test cached goal distances and their invalidation"""
+    print("=" * 60)
+    print("Testing goal distances")
+    print("=" * 60)
+
+    import tempfile
+    with tempfile.TemporaryDirectory(prefix="zwalker_distances_") as temp_dir:
+        kb = KnowledgeBase("/tmp/test_distances_game.z5", knowledge_dir=temp_dir)
+        kb.add_rooms_bulk([(1, "West of House", ""), (2, "North of House", ""),
+                           (3, "Behind House", "")])
+        kb.add_exits_bulk([(1, "north", 2), (2, "east", 3), (1, "east", 3)])
+
+        distances = kb.find_distances_from(3)
+        print(f"Distances to room 3: {dict(distances)}")
+        assert dict(distances) == {3: 0, 2: 1, 1: 1}
+        try:
+            distances[1] = 99
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("distance table should be read-only")
+
+        # Blocking the direct exit must not leave the cached distance behind
+        kb.mark_exit_blocked(1, "east", "boarded door")
+        distances = kb.find_distances_from(3)
+        print(f"After blocking 1->east: {dict(distances)}")
+        assert distances[1] == 2
+
+    return True
+
+
 def test_with_game(game_file: str):
     """Test knowledge base with actual game exploration"""
     print("\n" + "=" * 60)
@@ -146,6 +184,10 @@ def test_with_game(game_file: str):
     # Explore a few directions
     directions = ["north", "south", "east", "west"]
     for direction in directions[:4]:
+        # Known exit into an already-visited state: skip the round trip
+        if walker.skip_visited_exit(direction):
+            print(f"  {direction}: known")
+            continue
         result = walker.try_command(direction)
         status = "moved" if result.new_room else ("blocked" if result.blocked else "nothing")
         print(f"  {direction}: {status}")
@@ -201,6 +243,10 @@ def main():
         print("Standalone test failed!")
         return 1
 
+    if not test_distances_from_goal():
+        print("Distance test failed!")
+        return 1
+
     # Test with a real game if available
     game_file = find_test_game()
     if game_file:
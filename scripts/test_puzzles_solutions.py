@@ -11,6 +11,8 @@ Demonstrates:
 """
 
 import sys
+import tempfile
+from functools import partial, wraps
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -24,13 +26,30 @@ from zwalker.knowledge import (
 from zwalker.walker import GameWalker
 
 
-def test_puzzle_standalone():
+def _temp_knowledge_dir(name: str):
+    """
+    Give the test the knowledge_dir from main()'s shared temp root, or a
+    private temp directory, removed afterwards, when it runs on its own.
+    """
+    def decorate(test):
+        @wraps(test)
+        def wrapper(knowledge_dir=None):
+            if knowledge_dir is not None:
+                return test(str(knowledge_dir))
+            with tempfile.TemporaryDirectory(prefix=f"zwalker_{name}_test_") as tmp:
+                return test(tmp)
+        return wrapper
+    return decorate
+
+
+@_temp_knowledge_dir("puzzle")
+def test_puzzle_standalone(knowledge_dir=None):
     """Test puzzle creation and tracking without a game"""
     print("=" * 60)
     print("Testing Puzzle Tracking (standalone)")
     print("=" * 60)
 
-    kb = KnowledgeBase("/tmp/test_puzzle_game.z5", knowledge_dir="/tmp/zwalker_puzzle_test")
+    kb = KnowledgeBase("/tmp/test_puzzle_game.z5", knowledge_dir=knowledge_dir)
     kb.start_new_run()
 
     # Create puzzles
@@ -83,19 +102,20 @@ def test_puzzle_standalone():
     print(f"\nSaved to: {kb.knowledge_dir}")
 
     # Reload and verify
-    kb2 = KnowledgeBase("/tmp/test_puzzle_game.z5", knowledge_dir="/tmp/zwalker_puzzle_test")
+    kb2 = KnowledgeBase("/tmp/test_puzzle_game.z5", knowledge_dir=knowledge_dir)
     print(f"Reloaded: {len(kb2.puzzles.puzzles)} puzzles")
 
     return True
 
 
-def test_solution_standalone():
+@_temp_knowledge_dir("solution")
+def test_solution_standalone(knowledge_dir=None):
     """Test solution creation and execution without a game"""
     print("\n" + "=" * 60)
     print("Testing Solution Building (standalone)")
     print("=" * 60)
 
-    kb = KnowledgeBase("/tmp/test_solution_game.z5", knowledge_dir="/tmp/zwalker_solution_test")
+    kb = KnowledgeBase("/tmp/test_solution_game.z5", knowledge_dir=knowledge_dir)
     kb.start_new_run()
 
     # Build a solution manually
@@ -160,19 +180,43 @@ def test_solution_standalone():
     print(f"Saved to: {kb.knowledge_dir}")
 
     # Reload and verify
-    kb2 = KnowledgeBase("/tmp/test_solution_game.z5", knowledge_dir="/tmp/zwalker_solution_test")
+    kb2 = KnowledgeBase("/tmp/test_solution_game.z5", knowledge_dir=knowledge_dir)
     print(f"Reloaded: {len(kb2.solution.main_steps)} steps, {len(kb2.solution.branches)} branches")
 
     return True
 
 
-def test_puzzle_detection():
+@_temp_knowledge_dir("validate")
+def test_validate_duplicate_step_ids(knowledge_dir=None):
+    """Test that a duplicated step ID doesn't hide the steps after it"""
+    print("\n" + "=" * 60)
+    print("Testing Solution Validation with Duplicate Step IDs")
+    print("=" * 60)
+
+    kb = KnowledgeBase("/tmp/test_validate_game.z5", knowledge_dir=knowledge_dir)
+    kb.solution.main_steps = [
+        SolutionStep(id="a", command="north"),
+        SolutionStep(id="b", command="east"),
+        SolutionStep(id="a", command="west"),
+        SolutionStep(id="c", command="south", on_failure="branch:nope"),
+    ]
+
+    issues = SolutionExecutor(kb).validate_solution()
+    print(f"Validation issues: {issues}")
+    assert "Duplicate step ID: a" in issues
+    assert "Step c references unknown branch: nope" in issues
+
+    return True
+
+
+@_temp_knowledge_dir("detect")
+def test_puzzle_detection(knowledge_dir=None):
     """Test automatic puzzle detection from game output"""
     print("\n" + "=" * 60)
     print("Testing Puzzle Detection Heuristics")
     print("=" * 60)
 
-    kb = KnowledgeBase("/tmp/test_detect_game.z5", knowledge_dir="/tmp/zwalker_detect_test")
+    kb = KnowledgeBase("/tmp/test_detect_game.z5", knowledge_dir=knowledge_dir)
     kb.start_new_run()
 
     # Test various outputs that should trigger puzzle detection
@@ -246,29 +290,33 @@ def main():
     print("ZWalker Puzzle and Solution Tests")
     print("=" * 60)
 
-    tests = [
-        ("Puzzle Tracking", test_puzzle_standalone),
-        ("Solution Building", test_solution_standalone),
-        ("Puzzle Detection", test_puzzle_detection),
-        ("Game Integration", test_with_game),
-    ]
-
-    passed = 0
-    failed = 0
-
-    for name, test_func in tests:
-        try:
-            if test_func():
-                passed += 1
-                print(f"\n[PASS] {name}")
-            else:
+    # One temp root per run for the standalone knowledge bases; removed on exit
+    with tempfile.TemporaryDirectory(prefix="zwalker_puzzles_") as tmp:
+        root = Path(tmp)
+        tests = [
+            ("Puzzle Tracking", partial(test_puzzle_standalone, root / "puzzle")),
+            ("Solution Building", partial(test_solution_standalone, root / "solution")),
+            ("Duplicate Step IDs", partial(test_validate_duplicate_step_ids, root / "validate")),
+            ("Puzzle Detection", partial(test_puzzle_detection, root / "detect")),
+            ("Game Integration", test_with_game),
+        ]
+
+        passed = 0
+        failed = 0
+
+        for name, test_func in tests:
+            try:
+                if test_func():
+                    passed += 1
+                    print(f"\n[PASS] {name}")
+                else:
+                    failed += 1
+                    print(f"\n[FAIL] {name}")
+            except Exception as e:
                 failed += 1
-                print(f"\n[FAIL] {name}")
-        except Exception as e:
-            failed += 1
-            print(f"\n[ERROR] {name}: {e}")
-            import traceback
-            traceback.print_exc()
+                print(f"\n[ERROR] {name}: {e}")
+                import traceback
+                traceback.print_exc()
 
     print("\n" + "=" * 60)
     print(f"Results: {passed} passed, {failed} failed")
@@ -10,6 +10,7 @@ Demonstrates:
 5. Integration with GameWalker
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -22,6 +23,9 @@ from zwalker.knowledge import (
 )
 from zwalker.walker import GameWalker
 
+# Per-command lines are only printed with ZWALKER_TEST_VERBOSE=1
+VERBOSE = os.getenv("ZWALKER_TEST_VERBOSE", "0") == "1"
+
 
 def test_random_event_standalone():
     """Test random event detection without a game"""
@@ -216,6 +220,12 @@ def test_custom_random_events():
     assert result is None
     print(f"  Not detected in room 100 (expected)")
 
+    # Widening the rooms must reach the cached per-room tables
+    kb.randomness.update_event("cyclops_encounter", detection_rooms=[50, 51, 52, 100])
+    result = kb.check_for_random_event("A huge cyclops blocks your path!", room_id=100)
+    assert result is event
+    print(f"  Detected in room 100 after update_event")
+
     # Test response
     response = kb.get_random_response(event, inventory_names=["sword", "lunch"])
     print(f"  Response with lunch: {response}")
@@ -225,6 +235,36 @@ def test_custom_random_events():
     return True
 
 
+def test_response_persistence():
+    """Test that edits to an already-saved event survive a reload"""
+    print("\n" + "=" * 60)
+    print("Testing Response Persistence")
+    print("=" * 60)
+
+    import tempfile
+    with tempfile.TemporaryDirectory(prefix="zwalker_persist_") as temp_dir:
+        kb = KnowledgeBase("/tmp/test_persist_game.z5", knowledge_dir=temp_dir)
+        kb.start_new_run()
+        kb.init_common_random_events()
+        kb.save()
+
+        kb = KnowledgeBase("/tmp/test_persist_game.z5", knowledge_dir=temp_dir)
+        event = kb.randomness.events["thief_encounter"]
+        event.add_response("has axe", ["kill thief with axe"])
+        event.successful_response = "has axe"
+        kb.randomness.known_random_patterns.append("thief")
+        kb.save()
+
+        kb = KnowledgeBase("/tmp/test_persist_game.z5", knowledge_dir=temp_dir)
+        event = kb.randomness.events["thief_encounter"]
+        print(f"  Reloaded responses: {list(event.responses.keys())}")
+        assert event.responses["has axe"] == ["kill thief with axe"]
+        assert event.successful_response == "has axe"
+        assert kb.randomness.known_random_patterns == ["thief"]
+
+    return True
+
+
 def test_stats():
     """Test randomness statistics"""
     print("\n" + "=" * 60)
@@ -285,11 +325,19 @@ def test_with_game():
 
     # Explore a bit
     commands = ["north", "east", "open window", "west"]
+    blocked = 0
+    random_events = []
     for cmd in commands:
         result = walker.try_command(cmd)
-        status = "success" if not result.blocked else "blocked"
-        random_event = f" [RANDOM: {result.random_event}]" if result.random_event else ""
-        print(f"  {cmd}: {status}{random_event}")
+        blocked += result.blocked
+        if result.random_event:
+            random_events.append(result.random_event)
+        if VERBOSE:
+            status = "success" if not result.blocked else "blocked"
+            random_event = f" [RANDOM: {result.random_event}]" if result.random_event else ""
+            print(f"  {cmd}: {status}{random_event}")
+    print(f"Ran {len(commands)} commands: {len(commands) - blocked} succeeded, "
+          f"{blocked} blocked, random events: {', '.join(random_events) or 'none'}")
 
     # Check stats
     stats = walker.get_knowledge_stats()
@@ -312,6 +360,7 @@ def main():
         ("Snapshots and Variance", test_snapshot_and_variance),
         ("Response Handling", test_response_handling),
         ("Custom Random Events", test_custom_random_events),
+        ("Response Persistence", test_response_persistence),
         ("Statistics", test_stats),
         ("Game Integration", test_with_game),
     ]
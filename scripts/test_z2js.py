@@ -11,13 +11,14 @@ import json
 import subprocess
 from pathlib import Path
 
-def create_simple_walkthrough(game_file):
+def create_simple_walkthrough(game_file, game_data=None):
     """Create a simple walkthrough for testing"""
     from zwalker.zmachine import ZMachine
     from zwalker.walker import GameWalker
 
     print(f"Creating walkthrough for {game_file}...")
-    game_data = Path(game_file).read_bytes()
+    if game_data is None:
+        game_data = Path(game_file).read_bytes()
     walker = GameWalker(game_data)
 
     # Start game
@@ -61,7 +62,7 @@ def create_simple_walkthrough(game_file):
 
     return output_file, commands, transcript
 
-def replay_in_zwalker(game_file, commands):
+def replay_in_zwalker(game_file, commands, game_data=None):
     """Replay commands in zwalker and capture output"""
     from zwalker.zmachine import ZMachine
 
@@ -69,7 +70,8 @@ def replay_in_zwalker(game_file, commands):
     print("REPLAYING IN ZWALKER")
     print(f"{'='*60}")
 
-    game_data = Path(game_file).read_bytes()
+    if game_data is None:
+        game_data = Path(game_file).read_bytes()
     vm = ZMachine(game_data)
 
     # Initial run
@@ -145,11 +147,14 @@ def main():
         print(f"ERROR: Game file not found: {game_file}")
         sys.exit(1)
 
+    # Read the story file once; both zwalker passes copy it into VM memory
+    game_data = Path(game_file).read_bytes()
+
     # Step 1: Create walkthrough
-    walkthrough_file, commands, transcript = create_simple_walkthrough(game_file)
+    walkthrough_file, commands, transcript = create_simple_walkthrough(game_file, game_data)
 
     # Step 2: Replay in zwalker
-    zwalker_outputs = replay_in_zwalker(game_file, commands)
+    zwalker_outputs = replay_in_zwalker(game_file, commands, game_data)
 
     # Step 3: Test z2js conversion
     z2js_result = replay_in_z2js(game_file, commands)
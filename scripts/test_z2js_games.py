@@ -3,7 +3,10 @@
 Test all z2js-compiled games with their test scripts
 """
 
+import os
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 
@@ -12,46 +15,102 @@ def find_testable_games():
     scripts_dir = Path("scripts")
     testable = []
 
-    test_scripts = list(scripts_dir.glob("test_*_solution.js"))
+    # One directory read; the z2js check is then a set lookup, not a stat
+    with os.scandir(scripts_dir) as entries:
+        names = {e.name for e in entries if e.is_file()}
 
-    for test_script in test_scripts:
-        game_name = test_script.name.replace('test_', '').replace('_solution.js', '')
-        z2js_file = scripts_dir / f"{game_name}_z2js.js"
+    prefix, suffix = 'test_', '_solution.js'
+    for name in sorted(names):
+        if len(name) < len(prefix) + len(suffix):
+            continue
+        if not (name.startswith(prefix) and name.endswith(suffix)):
+            continue
+        game_name = name.replace('test_', '').replace('_solution.js', '')
+        z2js_name = f"{game_name}_z2js.js"
 
-        if z2js_file.exists():
+        if z2js_name in names:
             testable.append({
                 'name': game_name,
-                'test_script': test_script,
-                'z2js_file': z2js_file
+                'test_script': scripts_dir / name,
+                'z2js_file': scripts_dir / z2js_name
             })
 
     return testable
 
 def run_test(game_info, timeout=60):
-    """Run a single test"""
+    """
+    Run a single test.
+
+    Output is streamed and the script is stopped as soon as it prints
+    'TEST COMPLETE', instead of waiting for the game to wind down.
+    """
     try:
         # Run from scripts directory
         test_file = game_info['test_script'].name
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ["node", test_file],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=timeout,
+            bufsize=1,
             cwd=str(game_info['test_script'].parent)
         )
 
+        # Drain stderr on the side so a chatty child can't block on it
+        stderr_chunks = []
+        drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()),
+                                 daemon=True)
+        drain.start()
+
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+
+        stdout_lines = []
+        completed_early = False
+        try:
+            for line in proc.stdout:
+                stdout_lines.append(line)
+                if 'TEST COMPLETE' in line:
+                    completed_early = True
+                    break
+        finally:
+            timer.cancel()
+
+        if completed_early:
+            proc.terminate()
+        try:
+            proc.wait(timeout=1 if completed_early else None)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        drain.join(timeout=1)
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+
+        stdout = ''.join(stdout_lines)
+        stderr = ''.join(stderr_chunks)
+        # We stopped it ourselves after a clean finish
+        returncode = 0 if completed_early else proc.returncode
+
         # Check for success indicators
-        success = result.returncode == 0
-        has_victory = 'VICTORY' in result.stdout or 'won' in result.stdout.lower()
-        has_complete = 'TEST COMPLETE' in result.stdout
-        has_error = 'Error' in result.stderr or 'error' in result.stdout.lower()
+        success = returncode == 0
+        has_victory = 'VICTORY' in stdout or 'won' in stdout.lower()
+        has_complete = 'TEST COMPLETE' in stdout
+        has_error = 'Error' in stderr or 'error' in stdout.lower()
 
         return {
             'success': success and has_complete and not has_error,
-            'returncode': result.returncode,
+            'returncode': returncode,
             'victory': has_victory,
-            'stdout': result.stdout,
-            'stderr': result.stderr
+            'stdout': stdout,
+            'stderr': stderr
         }
     except subprocess.TimeoutExpired:
         return {
@@ -68,6 +127,25 @@ def run_test(game_info, timeout=60):
             'error': str(e)
         }
 
+def report_result(game_info, result):
+    """Print one test line; returns 'pass', 'fail' or 'timeout'"""
+    print(f"Testing {game_info['name']:20} ... ", end='', flush=True)
+
+    if result.get('timeout'):
+        print("✗ TIMEOUT")
+        return 'timeout'
+    elif result['success']:
+        status = "✓ PASS"
+        if result['victory']:
+            status += " (VICTORY)"
+        print(status)
+        return 'pass'
+    else:
+        print(f"✗ FAIL (exit {result['returncode']})")
+        if result.get('error'):
+            print(f"  Error: {result['error']}")
+        return 'fail'
+
 def main():
     print("="*60)
     print("Z2JS Test Suite Runner")
@@ -86,33 +164,21 @@ def main():
         print(f"  - {game['name']}")
     print()
 
-    passed = 0
-    failed = 0
-    timeout = 0
-
     print("Running tests...")
     print("-" * 60)
 
-    for game_info in testable:
-        game_name = game_info['name']
-        print(f"Testing {game_name:20} ... ", end='', flush=True)
-
-        result = run_test(game_info)
-
-        if result.get('timeout'):
-            print("✗ TIMEOUT")
-            timeout += 1
-        elif result['success']:
-            status = "✓ PASS"
-            if result['victory']:
-                status += " (VICTORY)"
-            print(status)
-            passed += 1
-        else:
-            print(f"✗ FAIL (exit {result['returncode']})")
-            failed += 1
-            if result.get('error'):
-                print(f"  Error: {result['error']}")
+    # Each test just waits on a node process, so run them concurrently and
+    # report in the original order as results arrive
+    workers = min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_test, game_info) for game_info in testable]
+        results = []
+        for game_info, future in zip(testable, futures):
+            results.append(report_result(game_info, future.result()))
+
+    passed = results.count('pass')
+    failed = results.count('fail')
+    timeout = results.count('timeout')
 
     print()
     print("="*60)
@@ -3,8 +3,13 @@
 Test zorkie ZIL compiler by compiling examples and testing with zwalker
 """
 
+import json
+import os
+import queue
+import select
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent to path
@@ -15,8 +20,85 @@ from zwalker.zmachine import ZMachine
 ZORKIE_DIR = Path.home() / "src" / "zorkie"
 OUTPUT_DIR = Path("/tmp/zorkie_tests")
 
-def compile_zil(zil_file, output_file, version=3):
-    """Compile a ZIL file with zorkie"""
+# Passing examples are only listed with ZWALKER_TEST_VERBOSE=1; failures
+# are always reported
+VERBOSE = os.getenv("ZWALKER_TEST_VERBOSE", "0") == "1"
+
+# Runs the zorkie CLI repeatedly inside one interpreter so its imports are
+# paid once per worker rather than once per example. Protocol: one JSON
+# argv list per line in, one {"code", "output"} object per line out.
+WORKER_SCRIPT = r"""
+import contextlib, io, json, os, runpy, sys, traceback
+proto = os.fdopen(os.dup(1), "w")
+os.dup2(2, 1)   # stray fd-level writes must not corrupt the protocol
+for line in sys.stdin:
+    sys.argv = ["zorkie"] + json.loads(line)
+    captured = io.StringIO()
+    code = 0
+    with contextlib.redirect_stdout(captured), contextlib.redirect_stderr(captured):
+        try:
+            runpy.run_path("zorkie", run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    proto.write(json.dumps({"code": code, "output": captured.getvalue()}) + "\n")
+    proto.flush()
+"""
+
+class ZorkieWorker:
+    """A long-lived zorkie process that compiles one file per request"""
+
+    def __init__(self):
+        self.proc = None
+
+    def _start(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-u", "-c", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            cwd=str(ZORKIE_DIR),
+            env={'PYTHONPATH': str(ZORKIE_DIR)}
+        )
+
+    def compile(self, zil_file, output_file, version=3, timeout=30):
+        """Same contract as compile_zil"""
+        try:
+            if self.proc is None or self.proc.poll() is not None:
+                self._start()
+            args = [str(zil_file), "-o", str(output_file), "-v", str(version)]
+            self.proc.stdin.write(json.dumps(args) + "\n")
+            self.proc.stdin.flush()
+
+            ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+            if not ready:
+                self.close()
+                return False, f"zorkie timed out after {timeout}s"
+            line = self.proc.stdout.readline()
+            if not line:
+                self.close()
+                return False, "zorkie worker exited unexpectedly"
+
+            reply = json.loads(line)
+            if reply["code"] == 0 and output_file.exists():
+                return True, None
+            return False, reply["output"]
+        except Exception as e:
+            self.close()
+            return False, str(e)
+
+    def close(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+def compile_zil(zil_file, output_file, version=3, worker=None):
+    """Compile a ZIL file with zorkie, via a persistent worker if given"""
+    if worker is not None:
+        return worker.compile(zil_file, output_file, version)
     try:
         result = subprocess.run(
             [sys.executable, "zorkie", str(zil_file), "-o", str(output_file), "-v", str(version)],
@@ -54,6 +136,21 @@ def test_z_file(z_file):
             'error': str(e)
         }
 
+def compile_and_test(zil_file, workers=None):
+    """Compile one example and run it; returns (success, error, test_result)"""
+    output_file = OUTPUT_DIR / f"{zil_file.stem}.z3"
+    if workers is None:
+        success, error = compile_zil(zil_file, output_file)
+    else:
+        worker = workers.get()
+        try:
+            success, error = compile_zil(zil_file, output_file, worker=worker)
+        finally:
+            workers.put(worker)
+    if not success:
+        return success, error, None
+    return success, error, test_z_file(output_file)
+
 def main():
     print("="*60)
     print("Testing Zorkie ZIL Compiler with ZWalker")
@@ -82,17 +179,30 @@ def main():
     passed_test = 0
     failed_test = 0
 
-    for zil_file in sorted(examples):
-        name = zil_file.stem
-        output_file = OUTPUT_DIR / f"{name}.z3"
+    # Compiles are separate zorkie processes writing distinct output files,
+    # so run them concurrently; results are still reported in order
+    examples = sorted(examples)
+    n_workers = min(8, os.cpu_count() or 1)
 
-        print(f"Testing {name:30} ... ", end='', flush=True)
+    # Persistent zorkie workers need select() on pipes, i.e. not Windows
+    workers = None
+    if os.name != 'nt':
+        workers = queue.Queue()
+        for _ in range(n_workers):
+            workers.put(ZorkieWorker())
 
-        # Compile
-        success, error = compile_zil(zil_file, output_file)
+    try:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            outcomes = list(pool.map(lambda f: compile_and_test(f, workers), examples))
+    finally:
+        while workers is not None and not workers.empty():
+            workers.get().close()
+
+    for zil_file, (success, error, test_result) in zip(examples, outcomes):
+        name = zil_file.stem
 
         if not success:
-            print(f"✗ COMPILE FAILED")
+            print(f"Testing {name:30} ... ✗ COMPILE FAILED")
             if error and len(error) < 100:
                 print(f"  Error: {error}")
             failed_compile += 1
@@ -100,17 +210,15 @@ def main():
 
         compiled += 1
 
-        # Test with zwalker
-        test_result = test_z_file(output_file)
-
         if test_result['success']:
-            output_preview = test_result['output'][:60].replace('\n', ' ')
-            print(f"✓ PASS ({test_result['size']} bytes)")
-            if output_preview:
-                print(f"  Output: {output_preview}...")
+            if VERBOSE:
+                output_preview = test_result['output'][:60].replace('\n', ' ')
+                print(f"Testing {name:30} ... ✓ PASS ({test_result['size']} bytes)")
+                if output_preview:
+                    print(f"  Output: {output_preview}...")
             passed_test += 1
         else:
-            print(f"✗ TEST FAILED")
+            print(f"Testing {name:30} ... ✗ TEST FAILED")
             print(f"  Error: {test_result['error']}")
             failed_test += 1
 
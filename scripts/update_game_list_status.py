@@ -3,8 +3,11 @@
 Update game_list.txt with zwalker_status based on existing solutions.
 """
 
+import csv
 import os
 import sys
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
 
 # Get project root
@@ -14,18 +17,62 @@ GAME_LIST_FILE = PROJECT_ROOT / "games" / "game_list.txt"
 
 def get_solved_games():
     """Get list of solved game names from solutions directory."""
-    solved = set()
-    if SOLUTIONS_DIR.exists():
-        for solution_file in SOLUTIONS_DIR.glob("*_solution.json"):
-            game_name = solution_file.stem.replace("_solution", "")
-            solved.add(game_name.lower())
-    return solved
-
+    if not SOLUTIONS_DIR.exists():
+        return set()
+    # Flat directory: a plain suffix check is cheaper than glob's fnmatch
+    suffix = "_solution.json"
+    return {
+        name[:-len(suffix)].lower()
+        for name in (p.name for p in SOLUTIONS_DIR.iterdir())
+        if name.endswith(suffix)
+    }
+
+@lru_cache(maxsize=None)
 def normalize_game_name(name):
     """Normalize game name for comparison."""
     # Remove common punctuation and spaces
     return name.lower().replace(" ", "").replace("'", "").replace("-", "")
 
+class PartialMatcher:
+    """
+    Finds a solved name that contains, or is contained in, a game name.
+
+    Replaces scanning every solved name per game line: names containing
+    the query are found with one str.find over all names joined, and names
+    contained in the query by looking up each of its substrings.
+    """
+
+    SEP = "\0"
+
+    def __init__(self, solved_normalized):
+        self.solved = solved_normalized
+        self.names = list(solved_normalized)
+        self.joined = self.SEP.join(self.names)
+        self.starts = []
+        offset = 0
+        for name in self.names:
+            self.starts.append(offset)
+            offset += len(name) + len(self.SEP)
+
+    def match(self, norm_name):
+        """Return the original solution name for a partial match, or None"""
+        if not self.names:
+            return None
+
+        # Some solved name contains norm_name
+        pos = self.joined.find(norm_name)
+        if pos >= 0:
+            return self.solved[self.names[bisect_right(self.starts, pos) - 1]]
+
+        # norm_name contains some solved name
+        n = len(norm_name)
+        for i in range(n):
+            for j in range(i + 1, n + 1):
+                found = self.solved.get(norm_name[i:j])
+                if found is not None:
+                    return found
+        return None
+
 def update_game_list():
     """Update game_list.txt with current zwalker status."""
     solved_games = get_solved_games()
@@ -35,6 +82,7 @@ def update_game_list():
     for game in solved_games:
         norm = normalize_game_name(game)
         solved_normalized[norm] = game
+    partial = PartialMatcher(solved_normalized)
 
     if not GAME_LIST_FILE.exists():
         print(f"Error: {GAME_LIST_FILE} not found")
@@ -43,55 +91,59 @@ def update_game_list():
     lines = []
     updated_count = 0
 
-    with open(GAME_LIST_FILE, 'r') as f:
-        for line in f:
-            original_line = line
-
-            # Skip comments and empty lines
-            if line.strip().startswith('#') or line.strip().startswith('=') or not line.strip():
-                lines.append(original_line)
-                continue
-
-            # Parse game line: name|ifdb_id|format|url|zwalker_status|zorkie_status|z2js_status
-            if '|' in line:
-                parts = line.strip().split('|')
-                if len(parts) >= 5:
-                    game_name = parts[0]
-                    norm_name = normalize_game_name(game_name)
-
-                    # Check if this game is solved
-                    is_solved = False
-                    solution_name = None
-
-                    # Direct match
-                    if norm_name in solved_normalized:
-                        is_solved = True
-                        solution_name = solved_normalized[norm_name]
-                    # Check for partial matches (e.g., "Zork I" -> "zork1")
-                    else:
-                        for solved_norm, solved_orig in solved_normalized.items():
-                            if solved_norm in norm_name or norm_name in solved_norm:
-                                is_solved = True
-                                solution_name = solved_orig
-                                break
-
-                    # Update status
-                    if is_solved:
-                        parts[4] = 'pass'
-                        updated_count += 1
-                        print(f"✓ {game_name} -> {solution_name}")
-                    elif parts[4] == 'untested':
-                        # Keep as untested if not solved
-                        pass
-
-                    # Reconstruct line
-                    line = '|'.join(parts) + '\n'
-
-            lines.append(line)
-
-    # Write updated file
-    with open(GAME_LIST_FILE, 'w') as f:
-        f.writelines(lines)
+    raw_lines = GAME_LIST_FILE.read_text().splitlines(keepends=True)
+
+    # Parse every game line in one csv pass:
+    # name|ifdb_id|format|url|zwalker_status|zorkie_status|z2js_status
+    # QUOTE_NONE keeps quote characters in names literal, as split('|') did
+    game_lines = [i for i, line in enumerate(raw_lines)
+                  if line.strip() and not line.strip().startswith(('#', '='))
+                  and '|' in line]
+    rows = csv.reader((raw_lines[i].strip() for i in game_lines),
+                      delimiter='|', quoting=csv.QUOTE_NONE)
+    parsed = dict(zip(game_lines, rows))
+
+    for i, line in enumerate(raw_lines):
+        # Comments, empty lines and anything else that isn't a game line
+        # pass through untouched
+        parts = parsed.get(i)
+        if parts is not None:
+            if len(parts) >= 5:
+                game_name = parts[0]
+                norm_name = normalize_game_name(game_name)
+
+                # Check if this game is solved
+                is_solved = False
+                solution_name = None
+
+                # Direct match
+                if norm_name in solved_normalized:
+                    is_solved = True
+                    solution_name = solved_normalized[norm_name]
+                # Check for partial matches (e.g., "Zork I" -> "zork1")
+                else:
+                    solution_name = partial.match(norm_name)
+                    is_solved = solution_name is not None
+
+                # Update status
+                if is_solved:
+                    parts[4] = 'pass'
+                    updated_count += 1
+                    print(f"✓ {game_name} -> {solution_name}")
+                elif parts[4] == 'untested':
+                    # Keep as untested if not solved
+                    pass
+
+                # Reconstruct line
+                line = '|'.join(parts) + '\n'
+
+        lines.append(line)
+
+    # Write updated file in one go, replacing the original only once the
+    # new contents are fully on disk
+    tmp_file = GAME_LIST_FILE.with_suffix('.tmp')
+    tmp_file.write_text(''.join(lines))
+    os.replace(tmp_file, GAME_LIST_FILE)
 
     print(f"\n✓ Updated {updated_count} games to 'pass' status")
     print(f"✓ Total solved games: {len(solved_games)}")
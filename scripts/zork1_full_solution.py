@@ -16,6 +16,22 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from zwalker.walker import GameWalker
 
 
+# Routes the walkthrough repeats from the Living Room; spliced into the
+# part lists below so each leg is spelled out once.
+LIVING_ROOM_TO_ROUND_ROOM = [
+    "go down",        # Cellar
+    "north",          # Troll Room
+    "east",           # E-W Passage
+    "east",           # Round Room
+]
+ROUND_ROOM_TO_DAM = [
+    "north",          # N-S Passage
+    "north",          # Chasm
+    "northeast",      # Reservoir South
+    "east",           # Dam
+]
+
+
 def create_walker():
     """Create a fresh walker for Zork 1."""
     game_file = Path(__file__).parent.parent / "games" / "zcode" / "zork1.z3"
@@ -26,44 +42,55 @@ def create_walker():
 
 def run_section(walker, name, commands):
     """Run a section of commands and report results."""
-    print(f"\n{'='*60}")
-    print(f" {name}")
-    print(f"{'='*60}")
+    # Report lines are collected and written once per section
+    out = [f"\n{'='*60}", f" {name}", '='*60]
+    emit = out.append
+    try_command = walker.try_command
+    get_room = walker.kb.get_room
+    rooms_seen = {}  # room_id -> Room, so revisits skip the kb lookup
 
     results = []
     for cmd in commands:
         if cmd.startswith('#'):
-            print(f"\n  {cmd}")
+            emit(f"\n  {cmd}")
             continue
 
-        result = walker.try_command(cmd)
+        result = try_command(cmd)
+        taken = "taken" in result.output.lower()
 
         # Determine status symbol
         if result.blocked:
             sym = "✗"
-        elif result.new_room or result.took_object or "taken" in result.output.lower():
+        elif result.new_room or result.took_object or taken:
             sym = "✓"
         else:
             sym = "·"
 
-        # Get first line of output
-        lines = result.output.strip().split('\n')
-        first_line = lines[0][:45] if lines else ""
+        # Get first line of output (without splitting the whole transcript)
+        output = result.output.strip()
+        end = output.find('\n')
+        first_line = (output if end < 0 else output[:end])[:45]
 
         # Format output
         if result.new_room:
-            room = walker.kb.get_room(walker.current_room_id)
-            room_name = room.name if room else str(walker.current_room_id)
-            print(f"  {sym} {cmd:25s} -> {room_name}")
-        elif "taken" in result.output.lower():
-            print(f"  {sym} {cmd:25s} [TAKEN]")
+            room_id = walker.current_room_id
+            room = rooms_seen.get(room_id)
+            if room is None:
+                room = rooms_seen[room_id] = get_room(room_id)
+            room_name = room.name if room else str(room_id)
+            emit(f"  {sym} {cmd:25s} -> {room_name}")
+        elif taken:
+            emit(f"  {sym} {cmd:25s} [TAKEN]")
         elif result.blocked:
-            print(f"  {sym} {cmd:25s} BLOCKED")
+            emit(f"  {sym} {cmd:25s} BLOCKED")
         else:
-            print(f"  {sym} {cmd:25s} {first_line}")
+            emit(f"  {sym} {cmd:25s} {first_line}")
 
         results.append((cmd, result))
 
+    out.append("")
+    sys.stdout.write("\n".join(out))
+    sys.stdout.flush()
     return results
 
 
@@ -172,10 +199,7 @@ def main():
 
     part3_commands = [
         "# Go to dam area",
-        "go down",        # Cellar
-        "north",          # Troll Room
-        "east",           # E-W Passage
-        "east",           # Round Room
+        *LIVING_ROOM_TO_ROUND_ROOM,
 
         "# Loud Room puzzle",
         "east",           # Loud Room
@@ -184,10 +208,7 @@ def main():
         "west",           # Round Room
 
         "# To the dam",
-        "north",          # N-S Passage
-        "north",          # Chasm
-        "northeast",      # Reservoir South
-        "east",           # Dam
+        *ROUND_ROOM_TO_DAM,
         "take all",       # Get matches if here
 
         "# Dam Lobby and Maintenance",
@@ -245,10 +266,7 @@ def main():
 
     part4_commands = [
         "# Go to Dome Room",
-        "go down",        # Cellar
-        "north",          # Troll Room
-        "east",           # E-W Passage
-        "east",           # Round Room
+        *LIVING_ROOM_TO_ROUND_ROOM,
         "southeast",      # Engravings Cave
         "east",           # Dome Room
 
@@ -299,12 +317,8 @@ def main():
 
     part5_commands = [
         "# Get to dam base",
-        "go down",
-        "north",          # Troll Room
-        "east", "east",   # Round Room
-        "north", "north", # Chasm
-        "northeast",      # Reservoir South
-        "east",           # Dam
+        *LIVING_ROOM_TO_ROUND_ROOM,
+        *ROUND_ROOM_TO_DAM,
         "down",           # Dam Base
 
         "# Get the boat",
@@ -380,8 +394,8 @@ def main():
     with open(solution_file, 'w') as f:
         f.write("# Zork 1 Complete Solution\n")
         f.write("# Generated by zwalker\n\n")
-        for cmd in solution_commands:
-            f.write(f"{cmd}\n")
+        if solution_commands:
+            f.write("\n".join(solution_commands) + "\n")
 
     print(f"Solution saved to: {solution_file}")
     print(f"Total commands: {len(solution_commands)}")
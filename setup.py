@@ -35,7 +35,7 @@ setup(
     ],
     extras_require={
         "ai": [
-            "anthropic>=0.7.0",  # For Claude AI
+            "anthropic>=0.40.0",  # For Claude AI
             "openai>=1.0.0",     # For GPT AI
         ],
         "dev": [
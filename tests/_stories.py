@@ -0,0 +1,23 @@
+"""Story files the tests drive, found relative to the source checkout."""
+
+from pathlib import Path
+
+from zwalker._story_cache import _load_story
+
+GAMES_DIR = Path(__file__).resolve().parent.parent / "games" / "zcode"
+
+# Shared by every test module; _load_story reads the file once per process
+ZORK1_BYTES = _load_story(str(GAMES_DIR / "zork1.z3"))
+
+# West of House -> Living Room with the lantern lit and the trap door open
+TRAP_DOOR_SETUP = (
+    "north",
+    "east",
+    "open window",
+    "enter window",
+    "west",
+    "take all",
+    "turn on lantern",
+    "move rug",
+    "open trap door",
+)
@@ -0,0 +1,23 @@
+"""Shared fixtures for the zork1 cellar/trap-door tests."""
+
+import pytest
+
+from zwalker import SnapshotCache
+from zwalker._story_cache import _fork_walker
+
+from _stories import TRAP_DOOR_SETUP, ZORK1_BYTES
+
+
+@pytest.fixture(scope="session")
+def trap_door_walker():
+    """Walker at the open trap door, built once per session.
+
+    Shared between tests; do not send it commands, use forked_walker.
+    """
+    return SnapshotCache.get_or_build(ZORK1_BYTES, TRAP_DOOR_SETUP)
+
+
+@pytest.fixture
+def forked_walker(trap_door_walker):
+    """Private copy of trap_door_walker that a test may play freely."""
+    return _fork_walker(trap_door_walker)
@@ -1,12 +1,9 @@
 #!/usr/bin/env python3
 """Reproduce the EXACT bug by loading the solver's checkpoint"""
 
-from pathlib import Path
-import json
-from zwalker.walker import GameWalker
+from zwalker import GameWalker
+from _stories import ZORK1_BYTES as game_data
 
-# Try to use the same path the solver used
-game_data = Path("games/zcode/zork1.z3").read_bytes()
 walker = GameWalker(game_data)
 
 walker.start()
@@ -34,11 +31,13 @@ test_cmds = ["north", "look", "south", "look"]
 for cmd in test_cmds:
     print(f"\n> {cmd}")
 
-    # Method 1: Direct VM
+    # Method 1: Direct VM, from a snapshot so both methods see the same turn
+    state = walker.vm.save_state()
     walker.vm.send_input(cmd)
     walker.vm.run()
     direct_output = walker.vm.get_output()
     print(f"Direct VM output: {direct_output[:150]}")
+    walker.vm.restore_state(state)
 
     # Method 2: try_command
     result = walker.try_command(cmd)
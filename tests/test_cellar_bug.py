@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 """Test to debug why commands fail in the cellar"""
 
-from pathlib import Path
-from zwalker.walker import GameWalker
+from zwalker import GameWalker
+from _stories import ZORK1_BYTES as game_data
 
-game_data = Path("games/zcode/zork1.z3").read_bytes()
 walker = GameWalker(game_data)
 
 print("="*80)
@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 """Reproduce the exact sequence that causes the cellar bug"""
 
-from pathlib import Path
-from zwalker.walker import GameWalker
+from zwalker import GameWalker
+from _stories import ZORK1_BYTES as game_data
 
-game_data = Path("games/zcode/zork1.z3").read_bytes()
 walker = GameWalker(game_data)
 
 print("="*80)
@@ -33,13 +32,12 @@ commands = [
     "north",
 ]
 
-for i, cmd in enumerate(commands, 1):
+results = walker.try_commands(commands)
+for i, (cmd, result) in enumerate(zip(commands, results), 1):
     print(f"\n{'='*80}")
     print(f"{i}. Command: {cmd}")
     print("="*80)
 
-    result = walker.try_command(cmd)
-
     print(f"Blocked: {result.blocked}")
     print(f"New room: {result.new_room}")
     print(f"Output: {result.output[:300]}")
@@ -1,13 +1,10 @@
 #!/usr/bin/env python3
 """Test that the restore_state fix works"""
 
-from pathlib import Path
-from zwalker.walker import GameWalker
+from zwalker import SnapshotCache
+from _stories import ZORK1_BYTES as game_data
 
-game_data = Path("games/zcode/zork1.z3").read_bytes()
-walker = GameWalker(game_data)
-
-walker.start()
+walker = SnapshotCache.get_or_build(game_data)
 
 # Get to trap door (using correct path)
 commands = [
@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 """Test exact output sequence to find the off-by-one bug"""
 
-from pathlib import Path
-from zwalker.zmachine import ZMachine
+from zwalker import GameWalker, ZMachine
+from _stories import ZORK1_BYTES as game_data
 
-game_data = Path("games/zcode/zork1.z3").read_bytes()
 vm = ZMachine(game_data)
 
 print("="*80)
@@ -47,8 +46,6 @@ print("="*80)
 print("TEST 2: Using GameWalker")
 print("="*80)
 
-from zwalker.walker import GameWalker
-
 walker = GameWalker(game_data)
 print("\n1. Starting game...")
 start_output = walker.start()
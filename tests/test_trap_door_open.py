@@ -1,30 +1,16 @@
 #!/usr/bin/env python3
 """Test opening trap door and descending"""
 
-from pathlib import Path
-from zwalker.walker import GameWalker
+from zwalker import SnapshotCache
+from _stories import TRAP_DOOR_SETUP, ZORK1_BYTES as game_data
 
-game_data = Path("games/zcode/zork1.z3").read_bytes()
-walker = GameWalker(game_data)
+# Get to trap door, stopping short of opening it
+setup_commands = TRAP_DOOR_SETUP[:-1]
 
-walker.start()
-
-# Get to trap door
-setup_commands = [
-    "east",
-    "north",
-    "open window",
-    "enter window",
-    "west",
-    "take all",
-    "turn on lantern",
-    "move rug",
-]
-
-for cmd in setup_commands:
-    result = walker.try_command(cmd)
+walker = SnapshotCache.get_or_build(game_data, setup_commands)
+for cmd, output in walker.full_transcript[-len(setup_commands):]:
     print(f"> {cmd}")
-    print(f"  {result.output[:100]}")
+    print(f"  {output[:100]}")
 
 print("\n" + "="*80)
 print("Opening trap door...")
@@ -1,29 +1,12 @@
 #!/usr/bin/env python3
 """Test to see what's in the VM output buffer at each step"""
 
-from pathlib import Path
-from zwalker.walker import GameWalker
-
-game_data = Path("games/zcode/zork1.z3").read_bytes()
-walker = GameWalker(game_data)
-
-walker.start()
-
-# Get to trap door (simplified sequence)
-setup_commands = [
-    "east",
-    "north",
-    "open window",
-    "enter window",
-    "west",
-    "take all",
-    "turn on lantern",
-    "move rug",
-    "open trap door",
-]
-
-for cmd in setup_commands:
-    walker.try_command(cmd)
+from zwalker import SnapshotCache
+from _stories import TRAP_DOOR_SETUP, ZORK1_BYTES as game_data
+
+# Get to trap door (same prefix as the conftest fixtures, so the
+# snapshot cache serves both)
+walker = SnapshotCache.get_or_build(game_data, TRAP_DOOR_SETUP)
 
 print("="*80)
 print("NOW AT TRAP DOOR - Testing descent to cellar")
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""Forks of the trap-door walker must not share game state"""
+
+
+def test_fork_matches_original(trap_door_walker, forked_walker):
+    assert forked_walker.full_transcript == trap_door_walker.full_transcript
+    assert forked_walker.current_room_id == trap_door_walker.current_room_id
+    assert forked_walker.vm.waiting_for_input
+
+
+def test_forks_are_independent(trap_door_walker, forked_walker):
+    room = trap_door_walker.current_room_id
+    transcript_len = len(trap_door_walker.full_transcript)
+    result = forked_walker.try_command("down")
+
+    assert result.new_room
+    assert trap_door_walker.current_room_id == room
+    assert len(trap_door_walker.full_transcript) == transcript_len
+    assert trap_door_walker.vm.memory is not forked_walker.vm.memory
+
+
+def test_map_version_tracks_exits(forked_walker):
+    version = forked_walker.map_version
+    forked_walker.try_command("down")
+    assert forked_walker.map_version > version
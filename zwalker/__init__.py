@@ -33,21 +33,39 @@ def _load_dotenv_file():
 
 _load_dotenv_file()
 
-from .zmachine import ZMachine
-from .walker import GameWalker
-from .agentic_solver import (
-    AgenticSolver,
-    WorldModel,
-    Perception,
-    Decision,
-    local_decider,
-    make_opus_decider,
-)
+# Public names are imported on first access (PEP 562), so a script that
+# only needs the interpreter doesn't pay for the walker and solver modules.
+_LAZY = {
+    "ZMachine": ".zmachine",
+    "GameWalker": ".walker",
+    "SnapshotCache": "._story_cache",
+    "AgenticSolver": ".agentic_solver",
+    "WorldModel": ".agentic_solver",
+    "Perception": ".agentic_solver",
+    "Decision": ".agentic_solver",
+    "local_decider": ".agentic_solver",
+    "make_opus_decider": ".agentic_solver",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __version__ = "0.1.0"
 __all__ = [
     "ZMachine",
     "GameWalker",
+    "SnapshotCache",
     "AgenticSolver",
     "WorldModel",
     "Perception",
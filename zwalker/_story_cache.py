@@ -0,0 +1,95 @@
+"""Process-wide caches for story files and warmed-up walkers.
+
+Harnesses that build many walkers for the same game (one per section or
+per solver iteration) would otherwise re-read the story file each time.
+The bytes are immutable, so every ZMachine can share one copy and take its
+own writable bytearray from it.
+
+Test scripts that all replay the same opening (start, then a fixed command
+prefix) can likewise share one interpreted run via SnapshotCache.
+"""
+
+import copy
+import types
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+from .walker import GameWalker
+
+
+@lru_cache(maxsize=8)
+def _load_story(path: str) -> bytes:
+    """Return the raw bytes of the story file at path, read once.
+
+    Kept as immutable bytes: every caller shares this one object, and
+    ZMachine makes its own writable bytearray from it.
+    """
+    return Path(path).read_bytes()
+
+
+def _fork_walker(walker: GameWalker) -> GameWalker:
+    """Return an independent copy of a walker parked at an input prompt.
+
+    The VM's pending read callback is a closure over the VM that created
+    it; deepcopy shares functions, so it is rebuilt against the copy.
+    """
+    clone = copy.deepcopy(walker)
+    callback = walker.vm.pending_input_callback
+    if callback is not None and callback.__closure__:
+        old_vm, new_vm = walker.vm, clone.vm
+        cells = tuple(
+            types.CellType(new_vm if cell.cell_contents is old_vm
+                           else cell.cell_contents)
+            for cell in callback.__closure__
+        )
+        clone.vm.pending_input_callback = types.FunctionType(
+            callback.__code__, callback.__globals__, callback.__name__,
+            callback.__defaults__, cells)
+    return clone
+
+
+class SnapshotCache:
+    """Walkers warmed up to a command prefix, shared within a process.
+
+    get_or_build() runs start() plus the given commands once per
+    (game, prefix) and hands out forks of that walker afterwards. A new
+    prefix resumes from the longest cached prefix of it rather than from
+    the start of the game.
+
+    Since game and input are deterministic, a fork is equivalent to
+    replaying the prefix, at the cost of one copy of the walker and its
+    memory instead of re-interpreting every opcode.
+    """
+
+    _walkers: Dict[Tuple[bytes, Tuple[str, ...]], GameWalker] = {}
+
+    @classmethod
+    def get_or_build(cls, game_data: bytes,
+                     commands: Iterable[str] = ()) -> GameWalker:
+        """Return a fresh walker that has started and run commands.
+
+        Output from the setup run is in the walker's full_transcript.
+        """
+        game_data = bytes(game_data)
+        commands = tuple(commands)
+        key = (game_data, commands)
+        if key not in cls._walkers:
+            for n in range(len(commands) - 1, -1, -1):
+                base = cls._walkers.get((game_data, commands[:n]))
+                if base is not None:
+                    walker = _fork_walker(base)
+                    break
+            else:
+                n = 0
+                walker = GameWalker(game_data)
+                walker.start()
+                cls._walkers[(game_data, ())] = _fork_walker(walker)
+            walker.try_commands(commands[n:])
+            cls._walkers[key] = walker
+        return _fork_walker(cls._walkers[key])
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop all cached walkers."""
+        cls._walkers.clear()
@@ -0,0 +1,183 @@
+"""Small helpers shared across zwalker modules.
+
+Kept free of zwalker imports so any module can use them without pulling
+in the walker, knowledge base or solvers.
+"""
+
+import json
+import os
+import re
+from dataclasses import MISSING, fields
+from functools import wraps
+from pathlib import Path
+from typing import Any, Optional
+
+# Optional: RE2 matches in linear time, so custom random-event patterns
+# can't backtrack catastrophically. Falls back to `re` when missing.
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Optional: orjson encodes the knowledge files and parses model responses
+# several times faster than the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def slotted(cls):
+    """
+    Rebuild a dataclass with __slots__ for its fields.
+
+    Equivalent to @dataclass(slots=True), which needs Python 3.10+. Used on
+    the small records that solutions create by the thousand.
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in field_names:
+        namespace.pop(name, None)       # Defaults live in the generated __init__
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = field_names
+
+    # ...except init=False fields with a plain default, which dataclass
+    # leaves to the class attribute we just removed
+    class_defaults = {f.name: f.default for f in fields(cls)
+                      if not f.init and f.default is not MISSING}
+    if class_defaults:
+        generated_init = namespace["__init__"]
+
+        @wraps(generated_init)
+        def __init__(self, *args, **kwargs):
+            for name, value in class_defaults.items():
+                setattr(self, name, value)
+            generated_init(self, *args, **kwargs)
+
+        namespace["__init__"] = __init__
+
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+def compile_detection_pattern(pattern: str):
+    """
+    Compile a case-insensitive detection regex, preferring RE2.
+
+    Patterns RE2 doesn't support (backreferences, lookaround) are
+    compiled with `re` instead.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile("(?i)" + pattern)
+        except Exception:
+            pass
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def write_json(path: Path, data: Any):
+    """
+    Write data as 2-space indented JSON, using orjson when available.
+
+    Writes a sibling .tmp file and renames it over path, so an interrupted
+    run leaves the previous file intact rather than a truncated one. orjson
+    writes raw UTF-8, so readers must open the file as UTF-8.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if orjson is not None:
+        tmp.write_bytes(orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """Best-effort extraction of a JSON value from free-form model output.
+
+    Handles the common ways an LLM wraps JSON:
+      * pure JSON
+      * JSON inside ```json ... ``` or ``` ... ``` markdown fences
+      * JSON with prose before and/or after it
+    Returns the parsed object, or None if nothing parseable is found (the
+    caller is then responsible for a sensible recovery rather than crashing
+    with "Expecting value: line 1 column 1").
+    """
+    if not text:
+        return None
+
+    for cand in _json_candidates(text):
+        try:
+            return _json_loads(cand)
+        except (json.JSONDecodeError, ValueError):
+            continue
+        except Exception:
+            continue
+    return None
+
+
+def _json_candidates(text: str):
+    """Yield the spans extract_json tries, cheapest first, so the balanced
+    scan only runs when the fenced body and the whole text don't parse."""
+    # 1) Strip markdown code fences and try the fenced body first.
+    if "```" in text:
+        fence = text.split("```", 1)[1]
+        # Drop an optional language tag like "json" on the opening fence line.
+        if "\n" in fence:
+            first_line, rest = fence.split("\n", 1)
+            if first_line.strip().lower() in ("json", "json5", ""):
+                fence = rest
+        fenced = fence.split("```", 1)[0].strip()
+        if fenced:
+            yield fenced
+
+    # 2) The whole text, stripped.
+    yield text.strip()
+
+    # 3) The first balanced {...} or [...] span anywhere in the text.
+    span = _first_balanced_json(text)
+    if span:
+        yield span
+
+
+def _json_loads(s: str) -> Any:
+    """json.loads, via orjson when available; stdlib json gets the last word
+    on anything orjson's stricter parser rejects."""
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(s)
+
+
+def _first_balanced_json(text: str) -> Optional[str]:
+    """Return the first balanced {...} or [...] substring, respecting strings."""
+    starts = [i for i, c in enumerate(text) if c in "{["]
+    for start in starts:
+        open_ch = text[start]
+        close_ch = "}" if open_ch == "{" else "]"
+        depth = 0
+        in_str = False
+        escape = False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_str:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_str = False
+                continue
+            if ch == '"':
+                in_str = True
+            elif ch == open_ch:
+                depth += 1
+            elif ch == close_ch:
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+    return None
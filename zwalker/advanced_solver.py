@@ -9,89 +9,206 @@ This solver uses:
 - Deep understanding of IF game mechanics
 """
 
+import io
 import os
+import re
 import json
 import time
-from typing import List, Dict, Optional, Any, Tuple
-from dataclasses import dataclass, field
+from typing import Deque, List, Dict, Optional, Any, Tuple
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import islice
+
+from ._util import compile_detection_pattern, extract_json, write_json
+
+
+# Common IF command patterns that mark a walkthrough line as a command.
+# A tuple so the prefix test is one C-level str.startswith call per line;
+# the stripped forms catch bare verbs like "go" written without an object.
+WALKTHROUGH_COMMAND_STARTS = (
+    'go ', 'north', 'south', 'east', 'west', 'up', 'down',
+    'n', 's', 'e', 'w', 'u', 'd',
+    'get ', 'take ', 'drop ', 'put ', 'give ',
+    'open ', 'close ', 'lock ', 'unlock ',
+    'look', 'examine ', 'read ', 'x ',
+    'inventory', 'i',
+    'climb ', 'enter ', 'exit ', 'leave ',
+    'turn ', 'push ', 'pull ', 'move ', 'press ',
+    'attack ', 'kill ', 'hit ', 'fight ',
+    'say ', 'tell ', 'ask ', 'show ',
+    'wave ', 'light ', 'extinguish ',
+    'eat ', 'drink ',
+    'tie ', 'untie ', 'cut ',
+    'dig', 'fill ', 'empty ',
+    'wear ', 'remove ',
+    'wait', 'z',
+    'save', 'restore', 'restart', 'quit',
+    'odysseus', 'ulysses',  # Zork-specific
+    'pray', 'ring ', 'wind ',
+    'inflate ', 'deflate ', 'launch',
+    'score', 'verbose', 'brief',
+)
+WALKTHROUGH_COMMAND_WORDS = frozenset(c.strip() for c in WALKTHROUGH_COMMAND_STARTS)
+
+
+WIN_PHRASES = [
+    "*** you have won ***",
+    "you have won",
+    "you've won",
+    "you are victorious",
+    "you have completed the game",
+    "you have died and gone to heaven",  # some games' victory framing
+]
+
+DEATH_PHRASES = [
+    "you have died",
+    "*** you have died ***",
+    "you are dead",
+    "you're dead",
+    "you died",
+    "your adventure ends here",
+    "game over",
+    "you have been killed",
+    "you were killed",
+    "that last blow was too much",
+    "restart, restore, or quit",
+    "type restart, restore, or quit"
+]
+
+# Each phrase list as one case-insensitive alternation, so a detector scans
+# the turn's output once instead of lowercasing it and testing every phrase.
+# compile_detection_pattern uses RE2's compiled automaton when installed.
+WIN_REGEX = compile_detection_pattern("|".join(map(re.escape, WIN_PHRASES)))
+DEATH_REGEX = compile_detection_pattern("|".join(map(re.escape, DEATH_PHRASES)))
+
+# Responses that mean a walkthrough command didn't take effect
+WALKTHROUGH_FAILURE_REGEX = compile_detection_pattern(
+    "|".join(map(re.escape, [
+        "can't see", "can't go", "don't understand", "isn't here", "you can't",
+    ])))
+
+# Prefixes for AdvancedAISolver.log, and the levels shown even when quiet
+LOG_PREFIXES = {
+    "INFO": "ℹ️ ",
+    "IMPORTANT": "⚠️ ",
+    "WIN": "🎉",
+    "ERROR": "❌",
+    "THINK": "🤔",
+    "PLAN": "📋",
+    "TRY": "🎯"
+}
+ALWAYS_LOGGED = frozenset(["IMPORTANT", "WIN", "ERROR"])
+
+# Strategic-planning instructions that are the same on every call. They go
+# in the system prompt, marked for prompt caching, ahead of the hints; only
+# the game state is sent fresh each time.
+STRATEGY_INSTRUCTIONS = """You are an expert interactive fiction game solver with deep understanding of IF puzzles, mechanics, and conventions.
 
+PRIMARY OBJECTIVE — MAXIMIZE SCORE:
+===================================
+Your single most important goal is to RAISE THE SCORE as high as possible.
+The current score, the maximum possible score and the best score reached so
+far this campaign are given under CURRENT GAME STATE.
+Points are the only objective measure of progress — exploration, taking items,
+and solving puzzles only matter insofar as they increase the score. Always
+prefer the action most likely to raise the score next.
 
-def extract_json(text: str) -> Optional[Any]:
-    """Best-effort extraction of a JSON value from free-form model output.
+CRITICAL IF SCORING MECHANIC — DEPOSITING, NOT CARRYING:
+In most treasure-hunt / collection IF games (the Zork family being the canonical
+example) you score points in TWO stages, and merely HOLDING a valuable does NOT
+give you its full points:
+  1. FIND and TAKE the treasure/objective item (small or no score), THEN
+  2. CARRY it back to and DEPOSIT it at the designated drop-off location — the
+     trophy case (Zork's "put <treasure> in case" in the living room), an altar,
+     a vault, a goal room, or whatever the game establishes as the deposit point.
+The big points are awarded on DEPOSIT/PUT, not on TAKE. So if you are carrying
+valuable items and your score has stalled, your top priority is to NAVIGATE BACK
+to the known deposit location and DEPOSIT (put/drop) each carried item there.
+Track where the deposit point is once you find it, and make return trips.
 
-    Handles the common ways an LLM wraps JSON:
-      * pure JSON
-      * JSON inside ```json ... ``` or ``` ... ``` markdown fences
-      * JSON with prose before and/or after it
-    Returns the parsed object, or None if nothing parseable is found (the
-    caller is then responsible for a sensible recovery rather than crashing
-    with "Expecting value: line 1 column 1").
-    """
-    if not text:
-        return None
+YOUR TASK:
+==========
+Analyze this game state deeply and create a strategic plan to WIN this game.
+If a walkthrough/hints section is provided below, USE IT to guide your strategy!
 
-    candidates: List[str] = []
-
-    # 1) Strip markdown code fences and try the fenced body first.
-    if "```" in text:
-        fence = text.split("```", 1)[1]
-        # Drop an optional language tag like "json" on the opening fence line.
-        if "\n" in fence:
-            first_line, rest = fence.split("\n", 1)
-            if first_line.strip().lower() in ("json", "json5", ""):
-                fence = rest
-        fenced = fence.split("```", 1)[0].strip()
-        if fenced:
-            candidates.append(fenced)
-
-    # 2) The whole text, stripped.
-    candidates.append(text.strip())
-
-    # 3) The first balanced {...} or [...] span anywhere in the text.
-    span = _first_balanced_json(text)
-    if span:
-        candidates.append(span)
-
-    for cand in candidates:
-        try:
-            return json.loads(cand)
-        except (json.JSONDecodeError, ValueError):
-            continue
-        except Exception:
-            continue
-    return None
-
-
-def _first_balanced_json(text: str) -> Optional[str]:
-    """Return the first balanced {...} or [...] substring, respecting strings."""
-    starts = [i for i, c in enumerate(text) if c in "{["]
-    for start in starts:
-        open_ch = text[start]
-        close_ch = "}" if open_ch == "{" else "]"
-        depth = 0
-        in_str = False
-        escape = False
-        for i in range(start, len(text)):
-            ch = text[i]
-            if in_str:
-                if escape:
-                    escape = False
-                elif ch == "\\":
-                    escape = True
-                elif ch == '"':
-                    in_str = False
-                continue
-            if ch == '"':
-                in_str = True
-            elif ch == open_ch:
-                depth += 1
-            elif ch == close_ch:
-                depth -= 1
-                if depth == 0:
-                    return text[start:i + 1]
-    return None
+Consider:
+1. What is the main objective/goal of this game?
+2. What puzzles or obstacles are currently blocking progress?
+3. What items or information might be needed?
+4. Are there unexplored areas that might contain keys/solutions?
+5. Are we stuck in a dead end that requires backtracking?
+6. What IF puzzle patterns apply here? (locked doors, inventory puzzles, NPCs, timing puzzles, etc.)
+
+Think step-by-step about the best strategy to make progress toward winning.
+
+Respond in JSON format:
+{
+    "analysis": "Deep analysis of current situation and what's blocking progress",
+    "goal": "Primary goal for next phase (e.g., 'find key to unlock door', 'solve light puzzle')",
+    "puzzle_pattern": "IF puzzle pattern detected (e.g., 'locked_door', 'inventory_combination', 'npc_dialogue', 'maze', etc.)",
+    "strategy": "Multi-step strategy to achieve goal",
+    "steps": [
+        "specific command or action 1",
+        "specific command or action 2",
+        ...
+    ],
+    "confidence": 0.8,
+    "requires_backtracking": false,
+    "reasoning": "Detailed explanation of why this strategy should work",
+    "alternatives": [
+        {"goal": "a different goal for this same situation", "steps": ["command", ...], "confidence": 0.5},
+        ...
+    ]
+}
+
+IMPORTANT:
+- ONLY USE WORDS THE PARSER KNOWS: every verb must come from the VERBS list and every noun from the NOUNS list in the game state (directions are always allowed). Do NOT invent words like "door" if it isn't listed.
+- MAXIMIZE SCORE (TOP PRIORITY): the score is shown under CURRENT GAME STATE. Prefer the action most likely to raise it. A rising score is the clearest sign of progress; if it has stalled, change approach.
+- DEPOSIT CARRIED TREASURES: remember that points usually come from PUTTING valuables in the trophy case / deposit location, not from carrying them. If you hold treasures and the score is flat, plan a route BACK to the known deposit point and "put <item> in case" (or drop it at the goal location) for each one.
+- PREFER UNTRIED DIRECTIONS to discover new rooms; NEVER retry BLOCKED DIRECTIONS.
+- Be specific with commands (not just "examine things" but "examine lamp", "take key", etc.)
+- Consider IF game logic (objects often need to be examined before use, doors unlocked before opening, etc.)
+- If truly stuck, suggest backtracking or systematic exploration
+- Aim for 5-15 concrete steps
+- ALTERNATIVES: also give up to 4 genuinely different fallback plans for this same situation. If the main plan makes no progress, they are tried in order before you are asked again.
+- Think about inventory management and puzzle dependencies
+- ONLY USE OBJECTS IN THE ROOM OR INVENTORY: Don't try to take, use, or interact with objects that aren't mentioned in the current room description or your inventory. Trying to use objects not present wastes turns and returns "You can't see any such thing."
+- AVOID DEATH: Check DEATH HISTORY in the game state. Don't repeat commands/situations that led to death.
+- In Zork, combat with trolls requires a weapon (sword). Don't go north without protection!
+- If a troll blocks a passage, you need to defeat it with the elvish sword before passing.
+- MAZE NAVIGATION: Pay attention to the Room ID! In mazes where all rooms look alike, the Room ID is UNIQUE and tells you which room you're actually in. Use room IDs to map the maze and avoid going in circles. Track which room ID connects to which direction.
+"""
+
+# Minimum seconds between periodic learned-state saves from save_checkpoint
+STATE_SAVE_INTERVAL = 300
+
+# Death causes kept in memory and in the state file; older ones are dropped
+# (death_count still counts every death)
+DEATH_HISTORY_LIMIT = 200
+
+
+CHECKPOINT_PAGE_SIZE = 256
+CHECKPOINT_REBASE_TURNS = 50
+
+
+def _changed_pages(base: bytes, memory: bytearray) -> Dict[int, bytes]:
+    """Return {offset: page} for each page of memory that differs from base."""
+    size = CHECKPOINT_PAGE_SIZE
+    pages = {}
+    for off in range(0, len(memory), size):
+        page = memory[off:off + size]
+        if page != base[off:off + size]:
+            pages[off] = bytes(page)
+    return pages
+
+
+def _apply_pages(base: bytes, pages: Dict[int, bytes]) -> bytearray:
+    """Return a writable copy of base with the given pages written over it."""
+    memory = bytearray(base)
+    for off, page in pages.items():
+        memory[off:off + len(page)] = page
+    return memory
 
 
 @dataclass
@@ -101,8 +218,12 @@ class GameState:
     inventory: List[str]
     command_history: List[str]
     output_history: List[str]
-    vm_state: Any  # Saved Z-machine state
+    vm_state: Any  # Saved Z-machine state, with memory=None (see below)
     turn_number: int
+    # Dynamic memory as the 256-byte pages that differ from memory_base,
+    # a snapshot shared with the checkpoints taken before and after it
+    memory_base: bytes = b""
+    memory_pages: Dict[int, bytes] = field(default_factory=dict)
 
 
 @dataclass
@@ -177,14 +298,23 @@ class AdvancedAISolver:
         # Long-term memory
         self.visited_rooms: Dict[int, Dict[str, Any]] = {}
         self.global_map: Dict[int, Dict[str, int]] = {}  # room_id -> {direction: room_id}
+        self._map_cache: Optional[Dict[int, Dict[str, Any]]] = None  # see build_context_for_ai
+        self._map_cache_version: Optional[int] = None
         self.inventory_history: List[List[str]] = []
         self.puzzles: Dict[str, PuzzleMemory] = {}
         self.current_strategy: Optional[Strategy] = None
         self.strategy_history: List[Strategy] = []
+        # Fallback plans from the last API answer, for the (room, inventory,
+        # score) situation it was asked about
+        self._alternatives: Deque[Strategy] = deque()
+        self._alternatives_key: Optional[Tuple] = None
+        self._system_prompt: Optional[List[Dict[str, Any]]] = None  # see _strategy_system_prompt
 
         # Checkpoints for backtracking
-        self.checkpoints: List[GameState] = []
         self.max_checkpoints = 20
+        self.checkpoints: Deque[GameState] = deque(maxlen=self.max_checkpoints)
+        self._checkpoint_base: bytes = b""
+        self._checkpoint_base_turn = 0
 
         # Game progress tracking
         self.turn_number = 0
@@ -198,33 +328,38 @@ class AdvancedAISolver:
 
         # Death tracking - to help AI avoid repeated deaths
         self.death_count = 0
-        self.death_causes = []  # List of (turn, room, last_command, cause)
+        self.death_causes = deque(maxlen=DEATH_HISTORY_LIMIT)  # Dicts of turn, room, command, output_snippet
 
         # Maze/room connection tracking - persists between runs
         self.room_connections = {}  # {from_room_id: {direction: to_room_id}}
         self.room_names = {}  # {room_id: name}
 
-        # State file for persistence
+        # State file for persistence; dirty until the learned data above
+        # has been saved or loaded, and again whenever it changes
         self.state_file = None
+        self._state_dirty = True
+        self._last_state_save = time.time()
 
     def save_learned_state(self, state_file: str = None):
         """Save learned knowledge to a file for resuming later"""
-        if state_file:
+        if state_file and state_file != self.state_file:
             self.state_file = state_file
-        if not self.state_file:
+            self._state_dirty = True
+        if not self.state_file or not self._state_dirty:
             return
 
         state = {
             "death_count": self.death_count,
-            "death_causes": self.death_causes,
+            "death_causes": list(self.death_causes),
             "room_connections": self.room_connections,
             "room_names": self.room_names,
             "turn_number": self.turn_number,
         }
 
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(state, f, indent=2)
+            write_json(self.state_file, state)
+            self._state_dirty = False
+            self._last_state_save = time.time()
             self.log(f"Saved learned state to {self.state_file}", "INFO")
         except Exception as e:
             self.log(f"Could not save state: {e}", "ERROR")
@@ -233,13 +368,15 @@ class AdvancedAISolver:
         """Load previously learned knowledge from a file"""
         self.state_file = state_file
         try:
-            with open(state_file, 'r') as f:
+            with open(state_file, 'r', encoding='utf-8') as f:
                 state = json.load(f)
 
             self.death_count = state.get("death_count", 0)
-            self.death_causes = state.get("death_causes", [])
+            self.death_causes = deque(state.get("death_causes", []),
+                                      maxlen=DEATH_HISTORY_LIMIT)
             self.room_connections = state.get("room_connections", {})
             self.room_names = state.get("room_names", {})
+            self._state_dirty = False
             # Don't restore turn_number - we're starting fresh game state
 
             self.log(f"Loaded learned state: {self.death_count} deaths, {len(self.room_connections)} room connections", "IMPORTANT")
@@ -254,12 +391,14 @@ class AdvancedAISolver:
     def record_room_transition(self, from_room: int, direction: str, to_room: int, room_name: str = None):
         """Record a room connection for maze mapping"""
         from_key = str(from_room)
-        if from_key not in self.room_connections:
-            self.room_connections[from_key] = {}
-        self.room_connections[from_key][direction] = to_room
+        connections = self.room_connections.setdefault(from_key, {})
+        if connections.get(direction) != to_room:
+            connections[direction] = to_room
+            self._state_dirty = True
 
-        if room_name and to_room:
+        if room_name and to_room and self.room_names.get(str(to_room)) != room_name:
             self.room_names[str(to_room)] = room_name
+            self._state_dirty = True
 
     def _load_hints(self, hints_file: str) -> Optional[str]:
         """Load hints/walkthrough from a file"""
@@ -279,32 +418,8 @@ class AdvancedAISolver:
         """
         commands = []
 
-        # Common IF command patterns
-        command_starts = [
-            'go ', 'north', 'south', 'east', 'west', 'up', 'down',
-            'n', 's', 'e', 'w', 'u', 'd',
-            'get ', 'take ', 'drop ', 'put ', 'give ',
-            'open ', 'close ', 'lock ', 'unlock ',
-            'look', 'examine ', 'read ', 'x ',
-            'inventory', 'i',
-            'climb ', 'enter ', 'exit ', 'leave ',
-            'turn ', 'push ', 'pull ', 'move ', 'press ',
-            'attack ', 'kill ', 'hit ', 'fight ',
-            'say ', 'tell ', 'ask ', 'show ',
-            'wave ', 'light ', 'extinguish ',
-            'eat ', 'drink ',
-            'tie ', 'untie ', 'cut ',
-            'dig', 'fill ', 'empty ',
-            'wear ', 'remove ',
-            'wait', 'z',
-            'save', 'restore', 'restart', 'quit',
-            'odysseus', 'ulysses',  # Zork-specific
-            'pray', 'ring ', 'wind ',
-            'inflate ', 'deflate ', 'launch',
-            'score', 'verbose', 'brief',
-        ]
-
-        for line in hints_content.split('\n'):
+        # Stream the lines rather than splitting the whole file into a list
+        for line in io.StringIO(hints_content):
             line = line.strip()
 
             # Skip empty lines
@@ -322,19 +437,13 @@ class AdvancedAISolver:
             # Skip lines that look like descriptions (too long, have certain patterns)
             if len(line) > 60:
                 continue
-            if ':' in line and not line.lower().startswith(('say ', 'tell ')):
+            line_lower = line.lower()
+            if ':' in line and not line_lower.startswith(('say ', 'tell ')):
                 continue
 
             # Check if line starts with a known command
-            line_lower = line.lower()
-            is_command = False
-
-            for cmd_start in command_starts:
-                if line_lower.startswith(cmd_start) or line_lower == cmd_start.strip():
-                    is_command = True
-                    break
-
-            if is_command:
+            if (line_lower.startswith(WALKTHROUGH_COMMAND_STARTS)
+                    or line_lower in WALKTHROUGH_COMMAND_WORDS):
                 commands.append(line)
 
         return commands
@@ -384,8 +493,7 @@ class AdvancedAISolver:
             if room_id_after != room_id_before:
                 room_info += f" → {room_id_after}"
             room_info += "]"
-            print(f"  {room_info} → {result.output[:200]}...")
-            print()
+            print(f"  {room_info} → {result.output[:200]}...\n")
 
             # Check for win condition
             if self.detect_win_condition(result.output):
@@ -397,40 +505,40 @@ class AdvancedAISolver:
 
     def log(self, message: str, level: str = "INFO"):
         """Logging with levels"""
-        if self.verbose or level in ["IMPORTANT", "WIN", "ERROR"]:
-            prefix = {
-                "INFO": "ℹ️ ",
-                "IMPORTANT": "⚠️ ",
-                "WIN": "🎉",
-                "ERROR": "❌",
-                "THINK": "🤔",
-                "PLAN": "📋",
-                "TRY": "🎯"
-            }.get(level, "")
-            print(f"{prefix} {message}")
+        if self.verbose or level in ALWAYS_LOGGED:
+            print(f"{LOG_PREFIXES.get(level, '')} {message}")
 
     def save_checkpoint(self):
         """Save current game state for potential backtracking"""
         # Get recent commands from transcript
         recent_commands = [cmd for cmd, _ in self.walker.full_transcript[-50:]]
 
+        # Store dynamic memory as pages changed since a baseline snapshot,
+        # taking a fresh baseline every CHECKPOINT_REBASE_TURNS turns
+        vm_state = self.walker.vm.save_state()
+        if (not self._checkpoint_base
+                or self.turn_number - self._checkpoint_base_turn >= CHECKPOINT_REBASE_TURNS):
+            self._checkpoint_base = bytes(vm_state.memory)
+            self._checkpoint_base_turn = self.turn_number
+        pages = _changed_pages(self._checkpoint_base, vm_state.memory)
+        vm_state.memory = None
+
         checkpoint = GameState(
             room_id=self.walker.current_room_id,
             inventory=self.get_current_inventory(),
             command_history=recent_commands,
             output_history=[],  # Truncate to save memory
-            vm_state=self.walker.vm.save_state(),
-            turn_number=self.turn_number
+            vm_state=vm_state,
+            turn_number=self.turn_number,
+            memory_base=self._checkpoint_base,
+            memory_pages=pages,
         )
 
-        self.checkpoints.append(checkpoint)
+        self.checkpoints.append(checkpoint)  # drops the oldest past max_checkpoints
 
-        # Keep only recent checkpoints
-        if len(self.checkpoints) > self.max_checkpoints:
-            self.checkpoints.pop(0)
-
-        # Also save learned state periodically (every 5 checkpoints)
-        if self.state_file and len(self.checkpoints) % 5 == 0:
+        # Also save learned state periodically; deaths and the end of the
+        # run save it straight away
+        if self.state_file and time.time() - self._last_state_save >= STATE_SAVE_INTERVAL:
             self.save_learned_state()
 
         self.log(f"Checkpoint saved (turn {self.turn_number})", "INFO")
@@ -442,7 +550,8 @@ class AdvancedAISolver:
             return False
 
         checkpoint = self.checkpoints[checkpoint_index]
-        self.walker.vm.restore_state(checkpoint.vm_state)
+        memory = _apply_pages(checkpoint.memory_base, checkpoint.memory_pages)
+        self.walker.vm.restore_state(replace(checkpoint.vm_state, memory=memory))
         self.turn_number = checkpoint.turn_number
 
         self.log(f"Restored to checkpoint at turn {checkpoint.turn_number}", "IMPORTANT")
@@ -470,44 +579,11 @@ class AdvancedAISolver:
                 pass
 
         # Generic endgame text (game-agnostic).
-        win_phrases = [
-            "*** you have won ***",
-            "you have won",
-            "you've won",
-            "you are victorious",
-            "you have completed the game",
-            "you have died and gone to heaven",  # some games' victory framing
-        ]
-        output_lower = output.lower()
-        for phrase in win_phrases:
-            if phrase in output_lower:
-                return True
-
-        return False
+        return WIN_REGEX.search(output) is not None
 
     def detect_death_condition(self, output: str) -> bool:
         """Check if player has died"""
-        death_phrases = [
-            "you have died",
-            "*** you have died ***",
-            "you are dead",
-            "you're dead",
-            "you died",
-            "your adventure ends here",
-            "game over",
-            "you have been killed",
-            "you were killed",
-            "that last blow was too much",
-            "restart, restore, or quit",
-            "type restart, restore, or quit"
-        ]
-
-        output_lower = output.lower()
-        for phrase in death_phrases:
-            if phrase in output_lower:
-                return True
-
-        return False
+        return DEATH_REGEX.search(output) is not None
 
     def build_context_for_ai(self, depth: int = 30) -> Dict[str, Any]:
         """Build comprehensive context for AI analysis"""
@@ -515,8 +591,6 @@ class AdvancedAISolver:
 
         # Recent history from transcript
         recent_transcript = self.walker.full_transcript[-depth:]
-        recent_commands = [cmd for cmd, _ in recent_transcript]
-        recent_outputs = [out for _, out in recent_transcript]
 
         # Current state
         current_inventory = self.get_current_inventory()
@@ -525,6 +599,14 @@ class AdvancedAISolver:
         explored_rooms = len(self.visited_rooms)
         total_exits_found = sum(len(r.exits) for r in self.walker.rooms.values())
 
+        # Rebuild the map only when the walker reports a room or exit change
+        if self.walker.map_version != self._map_cache_version:
+            self._map_cache = {
+                room_id: {"name": r.name, "exits": list(r.exits.keys())}
+                for room_id, r in self.walker.rooms.items()
+            }
+            self._map_cache_version = self.walker.map_version
+
         # Puzzle tracking
         active_puzzles = [p for p in self.puzzles.values() if p.likely_solution is None]
 
@@ -566,16 +648,13 @@ class AdvancedAISolver:
             "inventory": current_inventory,
             "recent_history": [
                 {"command": cmd, "output": out[:500]}  # Truncate long outputs
-                for cmd, out in zip(recent_commands, recent_outputs)
+                for cmd, out in recent_transcript
             ],
             "current_room_id": self.walker.current_room_id,  # Emphasize current room ID
             "map_knowledge": {
                 "rooms_explored": explored_rooms,
                 "exits_mapped": total_exits_found,
-                "current_map": {
-                    room_id: {"name": r.name, "exits": list(r.exits.keys())}
-                    for room_id, r in self.walker.rooms.items()
-                }
+                "current_map": self._map_cache
             },
             "puzzles": {
                 "active": [
@@ -600,7 +679,7 @@ class AdvancedAISolver:
             },
             "deaths": {
                 "total_deaths": self.death_count,
-                "recent_deaths": self.death_causes[-5:] if self.death_causes else []
+                "recent_deaths": list(islice(reversed(self.death_causes), 5))[::-1]
             }
         }
 
@@ -611,6 +690,19 @@ class AdvancedAISolver:
         Ask the AI to analyze the game state and create a multi-step strategic plan.
         This is the core of sophisticated game solving.
         """
+        # If the last plan left us in the same situation, try the next of the
+        # alternatives that came with it before asking again
+        situation = (
+            context['current_room_id'],
+            tuple(sorted(context['inventory'])),
+            context.get('score'),
+        )
+        if self._alternatives and self._alternatives_key == situation:
+            strategy = self._alternatives.popleft()
+            self.log(f"Trying alternative strategy: {strategy.goal}", "PLAN")
+            return strategy
+        self._alternatives.clear()
+
         self.log(f"Asking {self.model} for strategic plan...", "THINK")
 
         room_ctx = context['current_room']
@@ -625,32 +717,7 @@ class AdvancedAISolver:
         verbs = ', '.join(context.get('dictionary_verbs', [])[:60]) or '(unknown)'
         nouns = ', '.join(context.get('available_nouns', [])) or 'none'
 
-        prompt = f"""You are an expert interactive fiction game solver with deep understanding of IF puzzles, mechanics, and conventions.
-
-PRIMARY OBJECTIVE — MAXIMIZE SCORE:
-===================================
-Your single most important goal is to RAISE THE SCORE as high as possible.
-  Current score: {score}
-  Maximum possible score: {max_score_str}
-  Best score reached so far this campaign: {best_score}
-Points are the only objective measure of progress — exploration, taking items,
-and solving puzzles only matter insofar as they increase the score. Always
-prefer the action most likely to raise the score next.
-
-CRITICAL IF SCORING MECHANIC — DEPOSITING, NOT CARRYING:
-In most treasure-hunt / collection IF games (the Zork family being the canonical
-example) you score points in TWO stages, and merely HOLDING a valuable does NOT
-give you its full points:
-  1. FIND and TAKE the treasure/objective item (small or no score), THEN
-  2. CARRY it back to and DEPOSIT it at the designated drop-off location — the
-     trophy case (Zork's "put <treasure> in case" in the living room), an altar,
-     a vault, a goal room, or whatever the game establishes as the deposit point.
-The big points are awarded on DEPOSIT/PUT, not on TAKE. So if you are carrying
-valuable items and your score has stalled, your top priority is to NAVIGATE BACK
-to the known deposit location and DEPOSIT (put/drop) each carried item there.
-Track where the deposit point is once you find it, and make return trips.
-
-CURRENT GAME STATE:
+        prompt = f"""CURRENT GAME STATE:
 ===================
 Turn: {context['turn_number']}
 Score: {score_str}  (best so far: {best_score}, max: {max_score_str})
@@ -695,54 +762,7 @@ LEARNED ROOM CONNECTIONS (from previous runs):
 ==============================================
 {self._format_room_connections()}
 
-{self._format_hints_section()}
-
-YOUR TASK:
-==========
-Analyze this game state deeply and create a strategic plan to WIN this game.
-If a walkthrough/hints section is provided above, USE IT to guide your strategy!
-
-Consider:
-1. What is the main objective/goal of this game?
-2. What puzzles or obstacles are currently blocking progress?
-3. What items or information might be needed?
-4. Are there unexplored areas that might contain keys/solutions?
-5. Are we stuck in a dead end that requires backtracking?
-6. What IF puzzle patterns apply here? (locked doors, inventory puzzles, NPCs, timing puzzles, etc.)
-
-Think step-by-step about the best strategy to make progress toward winning.
-
-Respond in JSON format:
-{{
-    "analysis": "Deep analysis of current situation and what's blocking progress",
-    "goal": "Primary goal for next phase (e.g., 'find key to unlock door', 'solve light puzzle')",
-    "puzzle_pattern": "IF puzzle pattern detected (e.g., 'locked_door', 'inventory_combination', 'npc_dialogue', 'maze', etc.)",
-    "strategy": "Multi-step strategy to achieve goal",
-    "steps": [
-        "specific command or action 1",
-        "specific command or action 2",
-        ...
-    ],
-    "confidence": 0.8,
-    "requires_backtracking": false,
-    "reasoning": "Detailed explanation of why this strategy should work"
-}}
-
-IMPORTANT:
-- ONLY USE WORDS THE PARSER KNOWS: every verb must come from the VERBS list and every noun from the NOUNS list above (directions are always allowed). Do NOT invent words like "door" if it isn't listed.
-- MAXIMIZE SCORE (TOP PRIORITY): the score is shown above. Prefer the action most likely to raise it. A rising score is the clearest sign of progress; if it has stalled, change approach.
-- DEPOSIT CARRIED TREASURES: remember that points usually come from PUTTING valuables in the trophy case / deposit location, not from carrying them. If you hold treasures and the score is flat, plan a route BACK to the known deposit point and "put <item> in case" (or drop it at the goal location) for each one.
-- PREFER UNTRIED DIRECTIONS to discover new rooms; NEVER retry BLOCKED DIRECTIONS.
-- Be specific with commands (not just "examine things" but "examine lamp", "take key", etc.)
-- Consider IF game logic (objects often need to be examined before use, doors unlocked before opening, etc.)
-- If truly stuck, suggest backtracking or systematic exploration
-- Aim for 5-15 concrete steps
-- Think about inventory management and puzzle dependencies
-- ONLY USE OBJECTS IN THE ROOM OR INVENTORY: Don't try to take, use, or interact with objects that aren't mentioned in the current room description or your inventory. Trying to use objects not present wastes turns and returns "You can't see any such thing."
-- AVOID DEATH: Check death history above. Don't repeat commands/situations that led to death.
-- In Zork, combat with trolls requires a weapon (sword). Don't go north without protection!
-- If a troll blocks a passage, you need to defeat it with the elvish sword before passing.
-- MAZE NAVIGATION: Pay attention to the Room ID! In mazes where all rooms look alike, the Room ID is UNIQUE and tells you which room you're actually in. Use room IDs to map the maze and avoid going in circles. Track which room ID connects to which direction.
+Create your strategic plan for this game state, responding in the JSON format described.
 """
 
         try:
@@ -751,6 +771,7 @@ IMPORTANT:
                 max_tokens=4000,
                 # NOTE: Opus 4.8 removes temperature/top_p/top_k (they 400).
                 # Steering is done via the prompt instead.
+                system=self._strategy_system_prompt(),
                 messages=[{"role": "user", "content": prompt}]
             )
 
@@ -775,6 +796,20 @@ IMPORTANT:
                 confidence=data.get("confidence", 0.5)
             )
 
+            alternatives = data.get("alternatives")
+            if isinstance(alternatives, list):
+                self._alternatives.extend(
+                    Strategy(
+                        goal=alt.get("goal", "explore"),
+                        steps=alt["steps"],
+                        reasoning=f"Alternative to: {strategy.goal}",
+                        confidence=alt.get("confidence", 0.5),
+                    )
+                    for alt in alternatives[:4]
+                    if isinstance(alt, dict) and isinstance(alt.get("steps"), list) and alt["steps"]
+                )
+                self._alternatives_key = situation
+
             self.log(f"Strategy: {strategy.goal}", "PLAN")
             self.log(f"Confidence: {strategy.confidence:.0%}", "PLAN")
             self.log(f"Steps: {len(strategy.steps)}", "PLAN")
@@ -826,34 +861,41 @@ IMPORTANT:
 
         progress_made = False
 
+        # Bound once for the loop; the walker and VM don't change mid-strategy
+        walker = self.walker
+        vm = walker.vm
+        try_command = walker.try_command
+        log = self.log
+        num_steps = len(strategy.steps)
+
         for i, step in enumerate(strategy.steps):
-            self.log(f"Step {i+1}/{len(strategy.steps)}: {step}", "TRY")
+            log(f"Step {i+1}/{num_steps}: {step}", "TRY")
 
             # Track room ID before command
-            room_id_before = self.walker.current_room_id
+            room_id_before = walker.current_room_id
 
             # Execute command. Isolate per-command interpreter errors so a single
             # bad opcode (e.g. a write to static memory) can't abort an entire
             # expensive run. Mirror solve_local: restore the pre-command VM state,
             # record the command as a no-op failure, and continue the strategy.
-            pre_state = self.walker.vm.save_state()
+            pre_state = vm.save_state()
             try:
-                result = self.walker.try_command(step)
+                result = try_command(step)
             except Exception as e:  # noqa: BLE001 - includes ZMachineError
                 try:
-                    self.walker.vm.restore_state(pre_state)
+                    vm.restore_state(pre_state)
                 except Exception:
                     pass
-                self.walker.current_room_id = room_id_before
+                walker.current_room_id = room_id_before
                 self.turn_number += 1
-                self.log(f"VM error on '{step}' (skipped): {e}", "ERROR")
+                log(f"VM error on '{step}' (skipped): {e}", "ERROR")
                 if self.verbose:
                     print(f"  [Room {room_id_before}] → [vm-error: {e}]\n")
                 continue
             output = result.output
 
             # Track room ID after command
-            room_id_after = self.walker.current_room_id
+            room_id_after = walker.current_room_id
 
             self.turn_number += 1
 
@@ -870,7 +912,7 @@ IMPORTANT:
             if room_id_after != room_id_before:
                 # Extract direction from command
                 direction = step.lower().replace("go ", "").strip()
-                room = self.walker.rooms.get(room_id_after)
+                room = walker.rooms.get(room_id_after)
                 room_name = room.name if room else None
                 self.record_room_transition(room_id_before, direction, room_id_after, room_name)
 
@@ -884,7 +926,9 @@ IMPORTANT:
             # Check for death - restore from checkpoint if died
             if self.detect_death_condition(output):
                 self.death_count += 1
-                room = self.walker.rooms.get(self.walker.current_room_id)
+                self._state_dirty = True
+                self._alternatives.clear()  # don't replay a plan into the same death
+                room = walker.rooms.get(walker.current_room_id)
                 room_name = room.name if room else "Unknown"
                 # Record the death cause for learning
                 self.death_causes.append({
@@ -893,6 +937,8 @@ IMPORTANT:
                     "command": step,
                     "output_snippet": output[:200]
                 })
+                if self.state_file:
+                    self.save_learned_state()
                 self.log(f"PLAYER DIED (death #{self.death_count}) at turn {self.turn_number}! Command: '{step}' in {room_name}", "IMPORTANT")
                 self.log(f"Restoring checkpoint...", "IMPORTANT")
                 # Restore to a recent checkpoint (go back a few to avoid same death)
@@ -911,21 +957,21 @@ IMPORTANT:
             if result.score_delta > 0:
                 if result.score > self.best_score:
                     self.best_score = result.score
-                self.log(f"  ✓ SCORE +{result.score_delta} (now {result.score})", "WIN")
+                log(f"  ✓ SCORE +{result.score_delta} (now {result.score})", "WIN")
                 progress_made = True
                 self.last_progress_turn = self.turn_number
                 self.stuck_counter = 0
             elif result.new_room:
-                self.log(f"  ✓ Entered new room", "INFO")
+                log(f"  ✓ Entered new room", "INFO")
                 progress_made = True
                 self.last_progress_turn = self.turn_number
                 self.stuck_counter = 0
             elif result.took_object:
-                self.log(f"  ✓ Acquired object", "INFO")
+                log(f"  ✓ Acquired object", "INFO")
                 progress_made = True
                 self.last_progress_turn = self.turn_number
             elif result.interesting:
-                self.log(f"  ✓ Interesting event", "INFO")
+                log(f"  ✓ Interesting event", "INFO")
                 progress_made = True
                 self.last_progress_turn = self.turn_number
 
@@ -974,7 +1020,8 @@ IMPORTANT:
             if self.walkthrough_commands and self.walkthrough_index < len(self.walkthrough_commands):
                 cmd = self.get_next_walkthrough_command()
                 if cmd:
-                    self.log(f"Walkthrough [{self.walkthrough_index}/{len(self.walkthrough_commands)}]: {cmd}", "TRY")
+                    if self.verbose:
+                        self.log(f"Walkthrough [{self.walkthrough_index}/{len(self.walkthrough_commands)}]: {cmd}", "TRY")
 
                     # Execute the command
                     result = self.execute_command(cmd)
@@ -992,8 +1039,7 @@ IMPORTANT:
                             continue
 
                         # Check for "can't" messages that indicate command didn't work
-                        cant_patterns = ["can't see", "can't go", "don't understand", "isn't here", "you can't"]
-                        is_failure = any(p in output_text.lower() for p in cant_patterns)
+                        is_failure = WALKTHROUGH_FAILURE_REGEX.search(output_text) is not None
 
                         if is_failure:
                             consecutive_failures += 1
@@ -1005,7 +1051,8 @@ IMPORTANT:
                                 "turn": self.turn_number,
                                 "room": self.walker.current_room_id
                             })
-                            self.log(f"Command may have failed: {output_text[:100]}", "INFO")
+                            if self.verbose:
+                                self.log(f"Command may have failed: {output_text[:100]}", "INFO")
                         else:
                             consecutive_failures = 0  # Reset on success
 
@@ -1051,6 +1098,7 @@ IMPORTANT:
                         self.log("Too stuck - restoring earlier checkpoint", "IMPORTANT")
                         self.restore_checkpoint(-5)  # Go back 5 checkpoints
                         self.stuck_counter = 0
+                        self._alternatives.clear()
                 else:
                     self.stuck_counter = max(0, self.stuck_counter - 2)
 
@@ -1088,8 +1136,9 @@ IMPORTANT:
             self.log(f"Walkthrough: executed {self.walkthrough_index}/{len(self.walkthrough_commands)} commands", "INFO")
             if self.walkthrough_failures:
                 self.log(f"Walkthrough failures: {len(self.walkthrough_failures)}", "IMPORTANT")
-                for f in self.walkthrough_failures[:5]:  # Show first 5 failures
-                    self.log(f"  - #{f['index']}: '{f['command']}' -> {f['error'][:60]}...", "INFO")
+                if self.verbose:
+                    for f in islice(self.walkthrough_failures, 5):  # Show first 5 failures
+                        self.log(f"  - #{f['index']}: '{f['command']}' -> {f['error'][:60]}...", "INFO")
 
         return result
 
@@ -1153,6 +1202,17 @@ IMPORTANT:
 
         return "\n".join(lines) if lines else "No room connections learned yet."
 
+    def _strategy_system_prompt(self) -> List[Dict[str, Any]]:
+        """System prompt for get_strategic_plan: the fixed instructions plus
+        this run's hints, built once and marked for prompt caching."""
+        if self._system_prompt is None:
+            hints = self._format_hints_section()
+            text = STRATEGY_INSTRUCTIONS + ("\n" + hints if hints else "")
+            self._system_prompt = [
+                {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+            ]
+        return self._system_prompt
+
     def _format_hints_section(self) -> str:
         """Format hints/walkthrough section for the prompt"""
         if not self.hints:
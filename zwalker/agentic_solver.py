@@ -9,7 +9,8 @@ ON TOP of the already-working pieces:
   * ZMachine    (zwalker/zmachine.py) — get_score/get_turns/get_max_score,
                                          get_inventory, save_state/restore_state,
                                          get_objects_in_room/object tree.
-  * extract_json + the score/goal prompt framing (zwalker/advanced_solver.py).
+  * the score/goal prompt framing (zwalker/advanced_solver.py) and
+    extract_json (zwalker/_util.py).
 
 The existing AdvancedAISolver.solve() is left untouched; this is a NEW class.
 
@@ -30,13 +31,17 @@ Claude Opus 4.8 for real LLM runs.
 
 from __future__ import annotations
 
+import re
 import time
 from collections import deque
-from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
 from .walker import GameWalker, _normalize_direction, CANONICAL_DIRECTIONS
-from .advanced_solver import extract_json
+from ._util import compile_detection_pattern, extract_json
+from .advanced_solver import (
+    CHECKPOINT_REBASE_TURNS, _apply_pages, _changed_pages,
+)
 
 
 # Directions the parser understands as movement (used to tell a navigation
@@ -69,6 +74,11 @@ _DEATH_MARKERS = (
     "you clearly are a suicidal maniac",
 )
 
+# The marker tuples as case-insensitive alternations, so each check is one
+# scan of the response with no lowercased copy
+_REJECT_RE = compile_detection_pattern("|".join(map(re.escape, _REJECT_MARKERS)))
+_DEATH_RE = compile_detection_pattern("|".join(map(re.escape, _DEATH_MARKERS)))
+
 
 # =============================================================================
 # 3. STRUCTURED WORLD MODEL
@@ -339,6 +349,10 @@ class _Checkpoint:
     turn: int
     world: WorldModel       # shallow snapshot reference (we re-derive on restore)
     label: str = ""
+    # vm_state.memory is None; dynamic memory is memory_base with the
+    # changed pages in memory_pages written over it.
+    memory_base: bytes = b""
+    memory_pages: Dict[int, bytes] = field(default_factory=dict)
 
 
 class AgenticSolver:
@@ -382,8 +396,10 @@ class AgenticSolver:
         self.commands: List[str] = []
 
         # component 4: checkpoint stack + best-seen checkpoint
-        self.checkpoints: List[_Checkpoint] = []
+        self.checkpoints: Deque[_Checkpoint] = deque(maxlen=40)
         self.best_checkpoint: Optional[_Checkpoint] = None
+        self._checkpoint_base: bytes = b""
+        self._checkpoint_base_turn = 0
         self._turns_since_score = 0
 
     # ---- logging -----------------------------------------------------------
@@ -522,22 +538,32 @@ class AgenticSolver:
     # ---- 4. CHECKPOINTS / BACKTRACKING ------------------------------------
 
     def checkpoint(self, label: str = "") -> None:
+        # Checkpoints share one baseline copy of memory and keep only the
+        # pages that differ from it; see AdvancedAISolver.save_checkpoint.
+        vm_state = self.vm.save_state()
+        if (not self._checkpoint_base
+                or self.turn - self._checkpoint_base_turn >= CHECKPOINT_REBASE_TURNS):
+            self._checkpoint_base = bytes(vm_state.memory)
+            self._checkpoint_base_turn = self.turn
+        pages = _changed_pages(self._checkpoint_base, vm_state.memory)
+        vm_state.memory = None
         cp = _Checkpoint(
-            vm_state=self.vm.save_state(),
+            vm_state=vm_state,
             room_id=self.walker.current_room_id,
             score=self.vm.get_score(),
             turn=self.turn,
             world=self.world,
             label=label,
+            memory_base=self._checkpoint_base,
+            memory_pages=pages,
         )
         self.checkpoints.append(cp)
-        if len(self.checkpoints) > 40:
-            self.checkpoints.pop(0)
         if self.best_checkpoint is None or cp.score >= self.best_checkpoint.score:
             self.best_checkpoint = cp
 
     def _restore(self, cp: _Checkpoint, reason: str) -> None:
-        self.vm.restore_state(cp.vm_state)
+        memory = _apply_pages(cp.memory_base, cp.memory_pages)
+        self.vm.restore_state(replace(cp.vm_state, memory=memory))
         self.walker.current_room_id = cp.room_id
         self.walker.score = self.vm.get_score()
         self._turns_since_score = 0
@@ -843,13 +869,11 @@ class AgenticSolver:
 
     @staticmethod
     def _is_death(text: str) -> bool:
-        low = (text or "").lower()
-        return any(m in low for m in _DEATH_MARKERS)
+        return bool(text) and _DEATH_RE.search(text) is not None
 
     @staticmethod
     def _is_reject(text: str) -> bool:
-        low = (text or "").lower()
-        return any(m in low for m in _REJECT_MARKERS)
+        return bool(text) and _REJECT_RE.search(text) is not None
 
     def _classify(self, result, was_nav: bool, score_delta: int,
                   room_changed: bool, inv_gained: Set[str],
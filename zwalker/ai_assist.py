@@ -6,10 +6,11 @@ to help with automated exploration.
 """
 
 import os
-import json
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
 
+from ._util import extract_json
+
 
 @dataclass
 class GameContext:
@@ -53,6 +54,55 @@ class AIResponse:
     exploration_priority: str  # "high", "medium", "low"
 
 
+# Instructions and response format that close every analysis prompt
+_PROMPT_TAIL = """CRITICAL INSTRUCTIONS:
+- ONLY use verbs from the VERBS list above and nouns from the NOUNS list above (or the directions). Using any other word wastes a turn with "I don't know the word".
+- Your goal is to RAISE THE SCORE and reach the winning condition.
+- Prefer UNTRIED DIRECTIONS to discover new rooms; never retry BLOCKED DIRECTIONS.
+- Pick up items ("take all"), examine and open things, turn on a lamp if you have one.
+- Read descriptions for clues; unlock doors, solve puzzles, find keys.
+
+Suggest 5-10 commands that will raise the score / win. Prioritize:
+1. Actions that directly advance the plot or solve puzzles (score gains)
+2. Picking up useful items ("take all")
+3. Trying UNTRIED exits to find important areas
+4. Examining/opening objects for clues
+5. Only fall back to systematic exploration if truly stuck
+
+Respond in JSON format:
+{
+    "suggested_commands": ["command1", "command2", ...],
+    "reasoning": "brief explanation of how these help WIN the game",
+    "objects_of_interest": ["object1", "object2", ...],
+    "possible_puzzles": ["puzzle description", ...],
+    "exploration_priority": "high/medium/low"
+}
+"""
+
+
+# Nouns in a room description worth acting on, and what to try with each.
+_INTERACTIVE_HINTS = {
+    "door": ["open door", "unlock door"],
+    "window": ["open window", "enter"],
+    "button": ["push button", "press button"],
+    "lever": ["pull lever", "push lever"],
+    "chest": ["open chest", "examine chest"],
+    "box": ["open box", "examine box"],
+    "trapdoor": ["open trapdoor", "down"],
+    "grating": ["open grating", "down"],
+    "case": ["open case", "examine case"],
+    "mailbox": ["open mailbox", "read leaflet"],
+    "egg": ["take egg", "open egg"],
+    "rug": ["move rug", "look under rug"],
+}
+
+# Words a generated command may contain without being in the dictionary.
+_FILLER_WORDS = frozenset({
+    "all", "at", "to", "with", "on", "off", "the", "a", "an",
+    "in", "out", "up", "down", "through", "into",
+})
+
+
 class AIAssistant:
     """
     AI assistant for game exploration.
@@ -150,30 +200,8 @@ WORD CONSTRAINT — the game's parser ONLY understands these words:
   VERBS you may use: {verbs_str}
   NOUNS available now (visible objects + inventory): {nouns_str}
 
-CRITICAL INSTRUCTIONS:
-- ONLY use verbs from the VERBS list above and nouns from the NOUNS list above (or the directions). Using any other word wastes a turn with "I don't know the word".
-- Your goal is to RAISE THE SCORE and reach the winning condition.
-- Prefer UNTRIED DIRECTIONS to discover new rooms; never retry BLOCKED DIRECTIONS.
-- Pick up items ("take all"), examine and open things, turn on a lamp if you have one.
-- Read descriptions for clues; unlock doors, solve puzzles, find keys.
-
-Suggest 5-10 commands that will raise the score / win. Prioritize:
-1. Actions that directly advance the plot or solve puzzles (score gains)
-2. Picking up useful items ("take all")
-3. Trying UNTRIED exits to find important areas
-4. Examining/opening objects for clues
-5. Only fall back to systematic exploration if truly stuck
-
-Respond in JSON format:
-{{
-    "suggested_commands": ["command1", "command2", ...],
-    "reasoning": "brief explanation of how these help WIN the game",
-    "objects_of_interest": ["object1", "object2", ...],
-    "possible_puzzles": ["puzzle description", ...],
-    "exploration_priority": "high/medium/low"
-}}
 """
-        return prompt
+        return prompt + _PROMPT_TAIL
 
     def analyze(self, context: GameContext) -> AIResponse:
         """
@@ -236,6 +264,10 @@ Respond in JSON format:
         """
         dict_words = set(w.lower() for w in (context.dictionary_words or []))
         dict_verbs = set(v.lower() for v in (context.dictionary_verbs or []))
+        # Every prefix (up to 6 chars) of a dictionary word, so the truncated
+        # matches below are set lookups rather than scans of the dictionary.
+        word_prefixes = {dw[:i] for dw in dict_words for i in range(1, 7)}
+        verb_prefixes = {dv[:i] for dv in dict_verbs for i in range(1, 7)}
 
         def dict_has(word: str) -> bool:
             """A word is usable if it (or a 6-char prefix) is in the dictionary.
@@ -246,12 +278,13 @@ Respond in JSON format:
             if w in dict_words:
                 return True
             # Z-machine dictionaries store truncated words (4 chars V1-3, 6 V4+).
-            return any(dw.startswith(w[:6]) or w.startswith(dw) for dw in dict_words)
+            return (w[:6] in word_prefixes
+                    or any(w[:i] in dict_words for i in range(1, len(w))))
 
         def verb_ok(verb: str) -> bool:
             if dict_verbs:
                 v = verb.lower()
-                return v in dict_verbs or any(dv.startswith(v[:6]) for dv in dict_verbs)
+                return v in dict_verbs or v[:6] in verb_prefixes
             return dict_has(verb)
 
         def cmd_ok(cmd: str) -> bool:
@@ -262,10 +295,8 @@ Respond in JSON format:
             if not verb_ok(tokens[0]):
                 return False
             # Skip trivial fillers; require the remaining content words to exist.
-            fillers = {"all", "at", "to", "with", "on", "off", "the", "a", "an",
-                       "in", "out", "up", "down", "through", "into"}
             for tok in tokens[1:]:
-                if tok in fillers:
+                if tok in _FILLER_WORDS:
                     continue
                 if not dict_has(tok):
                     return False
@@ -309,21 +340,7 @@ Respond in JSON format:
         # 5) Nouns mentioned in the room description but not yet object-listed.
         desc_words = set(w.strip(".,!?;:'\"()").lower()
                          for w in context.room_description.split())
-        interactive_hints = {
-            "door": ["open door", "unlock door"],
-            "window": ["open window", "enter"],
-            "button": ["push button", "press button"],
-            "lever": ["pull lever", "push lever"],
-            "chest": ["open chest", "examine chest"],
-            "box": ["open box", "examine box"],
-            "trapdoor": ["open trapdoor", "down"],
-            "grating": ["open grating", "down"],
-            "case": ["open case", "examine case"],
-            "mailbox": ["open mailbox", "read leaflet"],
-            "egg": ["take egg", "open egg"],
-            "rug": ["move rug", "look under rug"],
-        }
-        for noun, cmds in interactive_hints.items():
+        for noun, cmds in _INTERACTIVE_HINTS.items():
             if noun in desc_words and noun not in seen_nouns:
                 suggested.extend(cmds)
                 objects_of_interest.append(noun)
@@ -379,8 +396,6 @@ Respond in JSON format:
         On hard failure it logs the raw response head and returns a sane default
         instead of throwing "Expecting value: line 1 column 1".
         """
-        from .advanced_solver import extract_json
-
         data = extract_json(response_text)
         if isinstance(data, dict):
             return AIResponse(
@@ -447,15 +462,13 @@ Respond with just a JSON list of commands:
             # Local fallback
             return [f"use {item}" for item in inventory[:3]] + ["examine", "look"]
 
-        try:
-            # Extract JSON list
-            if "[" in response_text:
-                start = response_text.find("[")
-                end = response_text.rfind("]") + 1
-                commands = json.loads(response_text[start:end])
+        # Extract JSON list
+        start = response_text.find("[")
+        if start != -1:
+            end = response_text.rfind("]") + 1
+            commands = extract_json(response_text[start:end])
+            if isinstance(commands, list):
                 return commands
-        except:
-            pass
 
         return ["examine", "look", "inventory"]
 
@@ -12,15 +12,21 @@ This enables learning across runs and avoiding repeated failures.
 
 from __future__ import annotations
 
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Tuple, Any, Set
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Any, Set, FrozenSet, Iterable
 from pathlib import Path
 import json
 import hashlib
+import re
 from datetime import datetime
 import os
 
+from ._util import compile_detection_pattern, slotted, write_json
+
 
 # =============================================================================
 # Enums
@@ -308,6 +314,12 @@ class ObjectTracker:
         self.objects[obj.id] = obj
         self._update_indexes()
 
+    def add_objects(self, objs: Iterable[GameObject]):
+        """Add or update several objects, rebuilding the indexes once"""
+        for obj in objs:
+            self.objects[obj.id] = obj
+        self._update_indexes()
+
     def get_objects_in_room(self, room_id: int) -> List[GameObject]:
         """Get all objects currently in a room"""
         return [
@@ -600,6 +612,15 @@ class PuzzleStatus(Enum):
     BLOCKED = "blocked"              # Needs something else first
 
 
+# Puzzle detection heuristics, checked in this order (first match wins).
+# Compiled once; detect_puzzle runs on every line of game output.
+LOCKED_PATTERN = re.compile(r"(locked|won't open|need.+key|requires?.+key)")
+DARKNESS_PATTERN = re.compile(r"(too dark|pitch.?dark|can't see|darkness|need.+light)")
+OBSTACLE_PATTERN = re.compile(r"(troll|thief|guard|monster|blocks?|won't let)")
+COMBAT_PATTERN = re.compile(r"(troll|thief|monster)")
+MECHANISM_PATTERN = re.compile(r"(button|lever|switch|mechanism|dial|combination)")
+
+
 @dataclass
 class Clue:
     """A clue or hint related to a puzzle"""
@@ -637,6 +658,7 @@ class PuzzleAttempt:
         return cls(**data)
 
 
+@slotted
 @dataclass
 class Puzzle:
     """A discovered puzzle in the game"""
@@ -810,22 +832,31 @@ class PuzzleTracker:
 # Solution Structures
 # =============================================================================
 
+@slotted
 @dataclass
 class Prerequisites:
     """Conditions that must be true to execute a step"""
     in_room: Optional[int] = None
-    has_items: List[int] = field(default_factory=list)
-    has_item_names: List[str] = field(default_factory=list)  # Alternate: by name
+    has_items: FrozenSet[int] = field(default_factory=frozenset)
+    has_item_names: FrozenSet[str] = field(default_factory=frozenset)  # Alternate: by name
     state_flags: Dict[str, bool] = field(default_factory=dict)
     puzzles_solved: List[str] = field(default_factory=list)
     not_conditions: List[str] = field(default_factory=list)
 
-    def check(self, current_room: int, inventory: List[int],
-              inventory_names: List[str], solved_puzzles: List[str],
+    def __post_init__(self):
+        # Callers (and saved JSON) pass lists; hash once so check() is O(|prereqs|)
+        self.has_items = frozenset(self.has_items)
+        self.has_item_names = frozenset(self.has_item_names)
+
+    def check(self, current_room: int, inventory: Iterable[int],
+              inventory_names: Iterable[str], solved_puzzles: Iterable[str],
               flags: Dict[str, bool] = None) -> Tuple[bool, str]:
         """
         Check if prerequisites are met.
 
+        Inventory and puzzle arguments may be any iterable; they are
+        converted to sets once per call.
+
         Returns (True, "") if met, (False, reason) if not.
         """
         flags = flags or {}
@@ -835,19 +866,24 @@ class Prerequisites:
             return False, f"must be in room {self.in_room}"
 
         # Check items by ID
-        for item_id in self.has_items:
-            if item_id not in inventory:
-                return False, f"missing item #{item_id}"
+        if self.has_items:
+            missing = self.has_items.difference(inventory)
+            if missing:
+                return False, f"missing item #{min(missing)}"
 
         # Check items by name
-        for item_name in self.has_item_names:
-            if item_name.lower() not in [n.lower() for n in inventory_names]:
-                return False, f"missing {item_name}"
+        if self.has_item_names:
+            names = {n.lower() for n in inventory_names}
+            for item_name in sorted(self.has_item_names):
+                if item_name.lower() not in names:
+                    return False, f"missing {item_name}"
 
         # Check puzzles
-        for puzzle_id in self.puzzles_solved:
-            if puzzle_id not in solved_puzzles:
-                return False, f"puzzle {puzzle_id} not solved"
+        if self.puzzles_solved:
+            solved = set(solved_puzzles)
+            for puzzle_id in self.puzzles_solved:
+                if puzzle_id not in solved:
+                    return False, f"puzzle {puzzle_id} not solved"
 
         # Check flags
         for flag, expected in self.state_flags.items():
@@ -864,8 +900,8 @@ class Prerequisites:
     def to_dict(self) -> dict:
         return {
             "in_room": self.in_room,
-            "has_items": self.has_items,
-            "has_item_names": self.has_item_names,
+            "has_items": sorted(self.has_items),
+            "has_item_names": sorted(self.has_item_names),
             "state_flags": self.state_flags,
             "puzzles_solved": self.puzzles_solved,
             "not_conditions": self.not_conditions,
@@ -876,6 +912,7 @@ class Prerequisites:
         return cls(**data)
 
 
+@slotted
 @dataclass
 class SolutionStep:
     """A single step in a solution"""
@@ -946,6 +983,7 @@ class SolutionStep:
         return step
 
 
+@slotted
 @dataclass
 class SolutionBranch:
     """A conditional branch in the solution"""
@@ -1112,6 +1150,32 @@ class Solution:
         return sol
 
 
+# Direction abbreviations expanded by normalize_command
+COMMAND_ABBREVS = {
+    "n": "north", "s": "south", "e": "east", "w": "west",
+    "ne": "northeast", "nw": "northwest",
+    "se": "southeast", "sw": "southwest",
+    "u": "up", "d": "down",
+}
+
+
+@lru_cache(maxsize=4096)
+def normalize_command(command: str) -> str:
+    """Normalize command for comparison.
+
+    Walkthroughs repeat a small vocabulary ("north", "take all", ...) many
+    times over, so results are memoized per raw command string.
+    """
+    parts = command.lower().split()
+    if parts:
+        if parts[0] in COMMAND_ABBREVS:
+            parts[0] = COMMAND_ABBREVS[parts[0]]
+        elif parts[0] == "go" and len(parts) > 1 and parts[1] in COMMAND_ABBREVS:
+            parts[1] = COMMAND_ABBREVS[parts[1]]
+
+    return " ".join(parts)
+
+
 # =============================================================================
 # Main Knowledge Base Class
 # =============================================================================
@@ -1176,6 +1240,9 @@ class KnowledgeBase:
         # State flags for prerequisites
         self.state_flags: Dict[str, bool] = {}
 
+        # goal room -> {room: steps to goal}; see find_distances_from
+        self._distance_cache: Dict[int, Dict[int, int]] = {}
+
         # Load existing knowledge
         self.load()
 
@@ -1201,28 +1268,40 @@ class KnowledgeBase:
         randomness_file = self.knowledge_dir / "randomness.json"
 
         if world_file.exists():
-            with open(world_file) as f:
+            with open(world_file, encoding="utf-8") as f:
                 self.world_map = WorldMap.from_dict(json.load(f))
+            self._distance_cache.clear()
 
         if objects_file.exists():
-            with open(objects_file) as f:
+            with open(objects_file, encoding="utf-8") as f:
                 self.objects = ObjectTracker.from_dict(json.load(f))
 
         if actions_file.exists():
-            with open(actions_file) as f:
+            with open(actions_file, encoding="utf-8") as f:
                 self.actions = ActionLog.from_dict(json.load(f))
 
         if puzzles_file.exists():
-            with open(puzzles_file) as f:
+            with open(puzzles_file, encoding="utf-8") as f:
                 self.puzzles = PuzzleTracker.from_dict(json.load(f))
 
         if solution_file.exists():
-            with open(solution_file) as f:
+            with open(solution_file, encoding="utf-8") as f:
                 self.solution = Solution.from_dict(json.load(f))
 
         if randomness_file.exists():
-            with open(randomness_file) as f:
+            with open(randomness_file, encoding="utf-8") as f:
                 self.randomness = RandomnessTracker.from_dict(json.load(f))
+            self.randomness.mark_saved()
+
+            # Occurrences appended since randomness.json was last rewritten
+            log_file = self.knowledge_dir / "randomness.log.jsonl"
+            if log_file.exists():
+                with open(log_file, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            self.randomness.replay_occurrence(
+                                record["event_id"], record["occurrence"])
 
         self.current_run = self.world_map.total_runs
 
@@ -1231,23 +1310,43 @@ class KnowledgeBase:
         self.world_map.last_updated = datetime.now().isoformat()
         self.solution.last_modified = datetime.now().isoformat()
 
-        with open(self.knowledge_dir / "world.json", "w") as f:
-            json.dump(self.world_map.to_dict(), f, indent=2)
+        write_json(self.knowledge_dir / "world.json", self.world_map.to_dict())
+        write_json(self.knowledge_dir / "objects.json", self.objects.to_dict())
+        write_json(self.knowledge_dir / "actions.json", self.actions.to_dict())
+        write_json(self.knowledge_dir / "puzzles.json", self.puzzles.to_dict())
+        write_json(self.knowledge_dir / "solution.json", self.solution.to_dict())
 
-        with open(self.knowledge_dir / "objects.json", "w") as f:
-            json.dump(self.objects.to_dict(), f, indent=2)
+        self._save_randomness()
 
-        with open(self.knowledge_dir / "actions.json", "w") as f:
-            json.dump(self.actions.to_dict(), f, indent=2)
+    def _save_randomness(self, compact: bool = False):
+        """
+        Persist randomness data.
 
-        with open(self.knowledge_dir / "puzzles.json", "w") as f:
-            json.dump(self.puzzles.to_dict(), f, indent=2)
+        Between structural changes, new event occurrences are appended to
+        randomness.log.jsonl instead of rewriting the whole history; the
+        log is folded back into randomness.json once it grows past
+        RandomnessTracker.COMPACT_AFTER records, or on compact().
+        """
+        base_file = self.knowledge_dir / "randomness.json"
+        log_file = self.knowledge_dir / "randomness.log.jsonl"
+
+        if compact or not base_file.exists() or self.randomness.needs_full_save():
+            write_json(base_file, self.randomness.to_dict())
+            if log_file.exists():
+                log_file.unlink()
+            self.randomness.mark_saved()
+            return
 
-        with open(self.knowledge_dir / "solution.json", "w") as f:
-            json.dump(self.solution.to_dict(), f, indent=2)
+        pending = self.randomness.take_pending_occurrences()
+        if pending:
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write("".join(
+                    json.dumps({"event_id": event_id, "occurrence": occurrence}) + "\n"
+                    for event_id, occurrence in pending))
 
-        with open(self.knowledge_dir / "randomness.json", "w") as f:
-            json.dump(self.randomness.to_dict(), f, indent=2)
+    def compact(self):
+        """Fold the randomness occurrence log back into randomness.json"""
+        self._save_randomness(compact=True)
 
     def start_new_run(self) -> int:
         """Start a new game run, returns run number"""
@@ -1276,6 +1375,7 @@ class KnowledgeBase:
             first_seen_turn=self.current_turn,
         )
         self.world_map.rooms[room_id] = room
+        self._distance_cache.clear()
 
         if self.world_map.starting_room_id is None:
             self.world_map.starting_room_id = room_id
@@ -1294,6 +1394,7 @@ class KnowledgeBase:
             exit_obj = room.exits[direction]
             if to_room is not None and exit_obj.destination_id is None:
                 exit_obj.destination_id = to_room
+                self._distance_cache.clear()
             return exit_obj
 
         exit_obj = Exit(
@@ -1302,8 +1403,19 @@ class KnowledgeBase:
             status=status,
         )
         room.exits[direction] = exit_obj
+        self._distance_cache.clear()
         return exit_obj
 
+    def add_rooms_bulk(self, rows: Iterable[Tuple[int, str, str]]) -> List[Room]:
+        """Add or update many rooms from (room_id, name, description) rows"""
+        return [self.add_room(room_id, name, description)
+                for room_id, name, description in rows]
+
+    def add_exits_bulk(self, rows: Iterable[Tuple[int, str, Optional[int]]]) -> List[Exit]:
+        """Add or update many exits from (from_room, direction, to_room) rows"""
+        return [self.add_exit(from_room, direction, to_room)
+                for from_room, direction, to_room in rows]
+
     def mark_exit_blocked(self, from_room: int, direction: str,
                           blocker: str, unlock_action: str = None):
         """Mark an exit as blocked"""
@@ -1318,6 +1430,7 @@ class KnowledgeBase:
         exit_obj.status = ExitStatus.BLOCKED.value
         exit_obj.blocker = blocker
         exit_obj.unlock_action = unlock_action
+        self._distance_cache.clear()
 
     def mark_exit_one_way(self, from_room: int, direction: str):
         """Mark an exit as one-way (can't return)"""
@@ -1348,7 +1461,6 @@ class KnowledgeBase:
             return None
 
         # BFS
-        from collections import deque
         queue = deque([(from_room, [])])
         visited = {from_room}
 
@@ -1375,6 +1487,47 @@ class KnowledgeBase:
 
         return None
 
+    def find_distances_from(self, goal_id: int) -> Mapping[int, int]:
+        """
+        Shortest number of moves from every room that can reach goal_id.
+
+        One BFS outward from the goal over reversed exits, so "how far is X
+        from the goal" for many X costs a single O(V+E) pass. Results are
+        cached per goal until the map changes through add_room/add_exit/
+        mark_exit_blocked; call invalidate_distances() after editing exits
+        directly. The result is a read-only view of the cached table.
+        """
+        cached = self._distance_cache.get(goal_id)
+        if cached is not None:
+            return MappingProxyType(cached)
+
+        # Reverse adjacency over passable exits (same rule as find_path)
+        incoming: Dict[int, List[int]] = defaultdict(list)
+        for room_id, room in self.world_map.rooms.items():
+            for exit_obj in room.exits.values():
+                if exit_obj.destination_id is None:
+                    continue
+                if exit_obj.status not in ["open", "one_way"]:
+                    continue
+                incoming[exit_obj.destination_id].append(room_id)
+
+        distances = {goal_id: 0}
+        queue = deque([goal_id])
+        while queue:
+            current = queue.popleft()
+            next_distance = distances[current] + 1
+            for source in incoming.get(current, ()):
+                if source not in distances:
+                    distances[source] = next_distance
+                    queue.append(source)
+
+        self._distance_cache[goal_id] = distances
+        return MappingProxyType(distances)
+
+    def invalidate_distances(self):
+        """Drop cached find_distances_from results"""
+        self._distance_cache.clear()
+
     # -------------------------------------------------------------------------
     # Object Operations
     # -------------------------------------------------------------------------
@@ -1407,6 +1560,40 @@ class KnowledgeBase:
 
         return obj
 
+    def add_objects_bulk(self, rows: Iterable[Tuple[int, str, Optional[int], bool]]
+                         ) -> List[GameObject]:
+        """
+        Add or update many objects from (obj_id, name, room_id, is_takeable)
+        rows. Same semantics as add_object, but the object indexes are
+        rebuilt once for the whole batch instead of once per object.
+        """
+        result = []
+        new_objects = []
+        for obj_id, name, room_id, is_takeable in rows:
+            if obj_id in self.objects.objects:
+                result.append(self.add_object(obj_id, name, room_id, is_takeable))
+                continue
+
+            obj = GameObject(
+                id=obj_id,
+                name=name,
+                initial_location=room_id,
+                current_location=room_id,
+                is_takeable=is_takeable,
+                first_seen_run=self.current_run,
+                first_seen_turn=self.current_turn,
+            )
+            new_objects.append(obj)
+            result.append(obj)
+
+            if room_id is not None and room_id in self.world_map.rooms:
+                room = self.world_map.rooms[room_id]
+                if obj_id not in room.objects_seen:
+                    room.objects_seen.append(obj_id)
+
+        self.objects.add_objects(new_objects)
+        return result
+
     def take_object(self, obj_id: int, command: str):
         """Record taking an object"""
         self.objects.move_object(
@@ -1467,24 +1654,7 @@ class KnowledgeBase:
 
     def _normalize_command(self, command: str) -> str:
         """Normalize command for comparison"""
-        cmd = command.lower().strip()
-
-        # Expand direction abbreviations
-        abbrevs = {
-            "n": "north", "s": "south", "e": "east", "w": "west",
-            "ne": "northeast", "nw": "northwest",
-            "se": "southeast", "sw": "southwest",
-            "u": "up", "d": "down",
-        }
-
-        parts = cmd.split()
-        if parts:
-            if parts[0] in abbrevs:
-                parts[0] = abbrevs[parts[0]]
-            elif parts[0] == "go" and len(parts) > 1 and parts[1] in abbrevs:
-                parts[1] = abbrevs[parts[1]]
-
-        return " ".join(parts)
+        return normalize_command(command)
 
     def should_skip_command(self, command: str, room_id: int,
                             current_state: Dict = None) -> Tuple[bool, str]:
@@ -1604,14 +1774,11 @@ class KnowledgeBase:
         - Combat encounters
         - Sequence puzzles (buttons, levers)
         """
-        import re
-        import uuid
-
         output_lower = output.lower()
         puzzle = None
 
         # Locked door/container
-        if re.search(r"(locked|won't open|need.+key|requires?.+key)", output_lower):
+        if LOCKED_PATTERN.search(output_lower):
             puzzle_id = f"lock_{room_id}_{len(self.puzzles.puzzles)}"
             puzzle = Puzzle(
                 id=puzzle_id,
@@ -1626,7 +1793,7 @@ class KnowledgeBase:
                            self.current_run, self.current_turn, "high")
 
         # Darkness
-        elif re.search(r"(too dark|pitch.?dark|can't see|darkness|need.+light)", output_lower):
+        elif DARKNESS_PATTERN.search(output_lower):
             puzzle_id = f"dark_{room_id}"
             # Check if already exists
             if puzzle_id not in self.puzzles.puzzles:
@@ -1642,20 +1809,20 @@ class KnowledgeBase:
                 self.world_map.has_darkness_mechanic = True
 
         # Blocked by creature/obstacle
-        elif re.search(r"(troll|thief|guard|monster|blocks?|won't let)", output_lower):
+        elif OBSTACLE_PATTERN.search(output_lower):
             puzzle_id = f"obstacle_{room_id}_{len(self.puzzles.puzzles)}"
             puzzle = Puzzle(
                 id=puzzle_id,
                 name=f"Obstacle in room {room_id}",
                 description=output[:200],
-                puzzle_type="combat" if re.search(r"(troll|thief|monster)", output_lower) else "obstacle",
+                puzzle_type="combat" if COMBAT_PATTERN.search(output_lower) else "obstacle",
                 room_id=room_id,
                 discovered_run=self.current_run,
                 discovered_turn=self.current_turn,
             )
 
         # Sequence/mechanism
-        elif re.search(r"(button|lever|switch|mechanism|dial|combination)", output_lower):
+        elif MECHANISM_PATTERN.search(output_lower):
             puzzle_id = f"mechanism_{room_id}_{len(self.puzzles.puzzles)}"
             puzzle = Puzzle(
                 id=puzzle_id,
@@ -1753,10 +1920,11 @@ class KnowledgeBase:
 
     def check_prerequisites(self, step: SolutionStep, room_id: int) -> Tuple[bool, str]:
         """Check if prerequisites for a step are met"""
-        inventory_ids = [obj.id for obj in self.get_inventory()]
-        inventory_names = [obj.name for obj in self.get_inventory()]
-        solved_puzzles = [p.id for p in self.puzzles.puzzles.values()
-                         if p.status == PuzzleStatus.SOLVED.value]
+        inventory = self.get_inventory()
+        inventory_ids = {obj.id for obj in inventory}
+        inventory_names = {obj.name for obj in inventory}
+        solved_puzzles = {p.id for p in self.puzzles.puzzles.values()
+                          if p.status == PuzzleStatus.SOLVED.value}
 
         return step.prerequisites.check(
             current_room=room_id,
@@ -1825,7 +1993,7 @@ class KnowledgeBase:
         events = create_common_random_events()
         for event in events:
             if event.id not in self.randomness.events:
-                self.randomness.events[event.id] = event
+                self.randomness.add_event(event)
 
     def check_for_random_event(self, output: str, room_id: int) -> Optional[RandomEvent]:
         """
@@ -1852,13 +2020,13 @@ class KnowledgeBase:
             output: Game output when event occurred
             response_used: Commands used to respond to event
         """
-        if event_id in self.randomness.events:
-            self.randomness.events[event_id].add_occurrence(
-                run=self.current_run,
-                turn=turn,
-                room_id=room_id,
-                output=output,
-            )
+        self.randomness.record_occurrence(
+            event_id,
+            run=self.current_run,
+            turn=turn,
+            room_id=room_id,
+            output=output,
+        )
 
     def add_custom_random_event(self, event_id: str, name: str,
                                 event_type: str, detection_pattern: str,
@@ -1881,9 +2049,9 @@ class KnowledgeBase:
             name=name,
             event_type=event_type,
             detection_pattern=detection_pattern,
-            detection_rooms=detection_rooms or [],
+            detection_rooms=detection_rooms or (),
         )
-        self.randomness.events[event_id] = event
+        self.randomness.add_event(event)
         return event
 
     def take_snapshot(self, room_id: int, room_name: str,
@@ -1939,7 +2107,9 @@ class KnowledgeBase:
         Returns:
             List of commands to execute as response
         """
-        inventory_names = inventory_names or []
+        # Lower-cased once, so each condition is a set lookup
+        inventory = {n.lower() for n in inventory_names or ()}
+        response = event.responses.get("default", [])
 
         # Check condition-based responses
         for condition, commands in event.responses.items():
@@ -1950,11 +2120,11 @@ class KnowledgeBase:
             # Format: "has <item>" or "in <room>"
             if condition.startswith("has "):
                 item = condition[4:]
-                if item.lower() in [n.lower() for n in inventory_names]:
-                    return commands
+                if item.lower() in inventory:
+                    response = commands
+                    break
 
-        # Return default response if no conditions match
-        return event.responses.get("default", [])
+        return response
 
     def get_random_objects(self) -> List[int]:
         """Get list of object IDs with random locations"""
@@ -1962,7 +2132,7 @@ class KnowledgeBase:
 
     def is_random_object(self, object_id: int) -> bool:
         """Check if an object has random location variance"""
-        return object_id in self.randomness.get_random_objects()
+        return self.randomness.is_random_object(object_id)
 
     # -------------------------------------------------------------------------
     # Intelligence Layer - Strategic Queries
@@ -2647,12 +2817,51 @@ class SolutionExecutor:
                 if branch.rejoin_at not in step_ids:
                     issues.append(f"Branch {branch.id} rejoin point {branch.rejoin_at} not found")
 
-        # Check on_failure branch references
-        for step in self.solution.main_steps:
+        # Check on_failure branch references along every reachable path.
+        # Walk the step graph (main path, on_failure jumps into branches and
+        # branch rejoins) with an explicit worklist so long solutions can't hit
+        # the recursion limit; `visited` memoizes (index, branch_id) nodes so
+        # re-entrant branches and rejoin cycles are expanded only once. Nodes
+        # are keyed by position, not step ID, so a duplicated ID (reported
+        # above) can't hide the steps after it.
+        main_index = {}
+        for i, step in enumerate(self.solution.main_steps):
+            main_index.setdefault(step.id, i)
+        visited: Set[Tuple[int, Optional[str]]] = set()
+        worklist = deque([(0, None)])          # (index in sequence, branch_id)
+
+        while worklist:
+            index, branch_id = worklist.popleft()
+            if branch_id is None:
+                steps = self.solution.main_steps
+            else:
+                steps = self.solution.branches[branch_id].steps
+            if index >= len(steps):
+                continue
+
+            step = steps[index]
+            key = (index, branch_id)
+            if key in visited:
+                continue
+            visited.add(key)
+
+            # Fall through to the next step, or rejoin the main path
+            if index + 1 < len(steps):
+                worklist.append((index + 1, branch_id))
+            elif branch_id is not None:
+                rejoin = self.solution.branches[branch_id].rejoin_at
+                if rejoin in main_index:
+                    worklist.append((main_index[rejoin], None))
+
             if step.on_failure.startswith("branch:"):
-                branch_id = step.on_failure[7:]
-                if branch_id not in self.solution.branches:
-                    issues.append(f"Step {step.id} references unknown branch: {branch_id}")
+                target = step.on_failure[7:]
+                if target in self.solution.branches:
+                    worklist.append((0, target))
+                elif branch_id is None:
+                    issues.append(f"Step {step.id} references unknown branch: {target}")
+                else:
+                    issues.append(f"Step {step.id} in branch {branch_id} "
+                                  f"references unknown branch: {target}")
 
         return issues
 
@@ -2661,6 +2870,7 @@ class SolutionExecutor:
 # Randomness Detection and Handling
 # =============================================================================
 
+@slotted
 @dataclass
 class RandomEvent:
     """A detected random event in the game"""
@@ -2670,7 +2880,7 @@ class RandomEvent:
 
     # Detection
     detection_pattern: str                      # Regex pattern that triggers this event
-    detection_rooms: List[int] = field(default_factory=list)  # Rooms where this can occur (empty = anywhere)
+    detection_rooms: FrozenSet[int] = field(default_factory=frozenset)  # Rooms where this can occur (empty = anywhere)
 
     # Occurrences
     occurrences: List[Dict[str, Any]] = field(default_factory=list)  # [{run, turn, room, output}, ...]
@@ -2681,6 +2891,22 @@ class RandomEvent:
     responses: Dict[str, List[str]] = field(default_factory=dict)  # {condition: [commands]}
     successful_response: Optional[str] = None   # Which condition's response worked
 
+    # (pattern string, compiled regex), built on first use (not serialized)
+    _compiled: Optional[Tuple[str, Any]] = field(default=None, init=False,
+                                                 repr=False, compare=False)
+
+    def __post_init__(self):
+        # Saved JSON and callers pass lists; check_for_event tests membership
+        self.detection_rooms = frozenset(self.detection_rooms)
+
+    @property
+    def compiled_pattern(self):
+        """detection_pattern compiled case-insensitively, cached per pattern string"""
+        if self._compiled is None or self._compiled[0] != self.detection_pattern:
+            self._compiled = (self.detection_pattern,
+                              compile_detection_pattern(self.detection_pattern))
+        return self._compiled[1]
+
     def add_occurrence(self, run: int, turn: int, room_id: int, output: str):
         """Record an occurrence of this event"""
         self.occurrences.append({
@@ -2720,7 +2946,7 @@ class RandomEvent:
             "name": self.name,
             "event_type": self.event_type,
             "detection_pattern": self.detection_pattern,
-            "detection_rooms": self.detection_rooms,
+            "detection_rooms": sorted(self.detection_rooms),
             "occurrences": self.occurrences,
             "first_seen_run": self.first_seen_run,
             "last_seen_run": self.last_seen_run,
@@ -2733,6 +2959,7 @@ class RandomEvent:
         return cls(**data)
 
 
+@slotted
 @dataclass
 class RunSnapshot:
     """Snapshot of game state at a point in a run"""
@@ -2765,6 +2992,7 @@ class RunSnapshot:
         return cls(object_locations=obj_locs, **data)
 
 
+@slotted
 @dataclass
 class VarianceRecord:
     """Record of detected variance between runs"""
@@ -2803,7 +3031,16 @@ class VarianceRecord:
         return unique
 
     def to_dict(self) -> dict:
-        return self.__dict__.copy()
+        return {
+            "id": self.id,
+            "variance_type": self.variance_type,
+            "subject_id": self.subject_id,
+            "subject_name": self.subject_name,
+            "observed_values": self.observed_values,
+            "is_random": self.is_random,
+            "affects_solution": self.affects_solution,
+            "notes": self.notes,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "VarianceRecord":
@@ -2826,39 +3063,206 @@ class RandomnessTracker:
     # Known random patterns
     known_random_patterns: List[str] = field(default_factory=list)
 
+    # All detection patterns OR'd into one regex, built on first use.
+    # False means the patterns can't be combined (see _dispatch_regex).
+    _dispatch: Any = field(default=None, init=False, repr=False, compare=False)
+
+    # LRU of recent check_for_event results keyed by (room_id, output);
+    # games repeat the same lines (room descriptions, status text) a lot
+    _detect_cache: OrderedDict = field(default_factory=OrderedDict, init=False,
+                                       repr=False, compare=False)
+
+    # Object IDs with location variance, in discovery order (derived from
+    # variances, not serialized); kept current by add_variance
+    _random_objects: Dict[int, None] = field(default_factory=dict, init=False,
+                                             repr=False, compare=False)
+
+    # room_id -> events that can fire there (see _events_for_room)
+    _room_events: Dict[int, Tuple[RandomEvent, ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+
+    # Persistence bookkeeping (see KnowledgeBase._save_randomness): event
+    # occurrences recorded since the last write, and whether anything else
+    # changed, which forces a full rewrite of randomness.json. Events and
+    # known_random_patterns are public and edited in place (add_response,
+    # successful_response), so they are compared against their state at
+    # the last save rather than flagged.
+    _pending_occurrences: List[Tuple[str, Dict[str, Any]]] = field(
+        default_factory=list, init=False, repr=False, compare=False)
+    _structure_dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    _saved_signature: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _logged_occurrences: int = field(default=0, init=False, repr=False, compare=False)
+
+    DETECT_CACHE_SIZE = 512
+    COMPACT_AFTER = 500             # Log records before randomness.json is rewritten
+
     def add_event(self, event: RandomEvent):
         """Add a random event"""
         self.events[event.id] = event
+        self.detection_changed()
+
+    def update_event(self, event_id: str, **changes) -> Optional[RandomEvent]:
+        """
+        Change fields of a known event; None if the ID is unknown.
+
+        Use this (or call detection_changed afterwards) when editing
+        detection_pattern or detection_rooms, so check_for_event stops
+        answering from tables built for the old values.
+        """
+        event = self.events.get(event_id)
+        if event is None:
+            return None
+        for name, value in changes.items():
+            if not hasattr(event, name):
+                raise AttributeError(f"RandomEvent has no field {name!r}")
+            setattr(event, name, value)
+        event.detection_rooms = frozenset(event.detection_rooms)
+        self.detection_changed()
+        return event
+
+    def detection_changed(self):
+        """
+        Drop everything derived from the events' detection fields.
+
+        The combined dispatch regex, the check_for_event LRU and the
+        per-room event tables are rebuilt on next use.
+        """
+        self._dispatch = None
+        self._detect_cache.clear()
+        self._room_events.clear()
+        self._structure_dirty = True
+
+    def record_occurrence(self, event_id: str, run: int, turn: int,
+                          room_id: int, output: str) -> bool:
+        """Record an occurrence of a known event; False if the ID is unknown"""
+        event = self.events.get(event_id)
+        if event is None:
+            return False
+        event.add_occurrence(run, turn, room_id, output)
+        self._pending_occurrences.append((event_id, event.occurrences[-1]))
+        return True
+
+    def replay_occurrence(self, event_id: str, occurrence: Dict[str, Any]):
+        """Re-apply an occurrence read back from the append-only log"""
+        event = self.events.get(event_id)
+        if event is None:
+            return
+        event.occurrences.append(occurrence)
+        event.last_seen_run = occurrence.get("run", event.last_seen_run)
+        if event.first_seen_run == 0:
+            event.first_seen_run = event.last_seen_run
+        self._logged_occurrences += 1
+
+    def _structure_signature(self) -> str:
+        """Serialized event and pattern state that the occurrence log can't replay"""
+        return json.dumps([
+            [(e.id, e.name, e.event_type, e.detection_pattern,
+              sorted(e.detection_rooms), e.responses, e.successful_response)
+             for e in self.events.values()],
+            self.known_random_patterns,
+        ], sort_keys=True)
+
+    def needs_full_save(self) -> bool:
+        """True if only a complete rewrite can persist the current state"""
+        return (self._structure_dirty or
+                self._logged_occurrences + len(self._pending_occurrences) > self.COMPACT_AFTER or
+                self._structure_signature() != self._saved_signature)
+
+    def take_pending_occurrences(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Hand over occurrences not yet written, counting them as logged"""
+        pending = self._pending_occurrences
+        self._pending_occurrences = []
+        self._logged_occurrences += len(pending)
+        return pending
+
+    def mark_saved(self):
+        """Everything in memory is now in randomness.json"""
+        self._pending_occurrences = []
+        self._structure_dirty = False
+        self._logged_occurrences = 0
+        self._saved_signature = self._structure_signature()
 
     def add_variance(self, variance: VarianceRecord):
         """Add a variance record"""
         self.variances[variance.id] = variance
+        self._structure_dirty = True
+        if variance.variance_type == "object_location" and variance.subject_id is not None:
+            self._random_objects[variance.subject_id] = None
 
     def add_snapshot(self, snapshot: RunSnapshot):
         """Add a run snapshot"""
+        self._structure_dirty = True
         if snapshot.run not in self.run_snapshots:
             self.run_snapshots[snapshot.run] = []
         self.run_snapshots[snapshot.run].append(snapshot)
 
+    def _dispatch_regex(self):
+        """
+        Single alternation over every event's detection_pattern.
+
+        Returns None if the patterns can't be safely combined (e.g. one
+        uses numbered backreferences or a mid-pattern global flag).
+        """
+        if self._dispatch is None:
+            patterns = [e.detection_pattern for e in self.events.values()]
+            self._dispatch = False
+            if patterns and not any(re.search(r"\\\d", p) for p in patterns):
+                try:
+                    self._dispatch = compile_detection_pattern(
+                        "|".join(f"(?:{p})" for p in patterns))
+                except re.error:
+                    pass
+        return self._dispatch or None
+
     def check_for_event(self, output: str, room_id: int) -> Optional[RandomEvent]:
         """Check if output matches any known random event"""
-        import re
-        for event in self.events.values():
-            # Check room restriction
-            if event.detection_rooms and room_id not in event.detection_rooms:
-                continue
+        key = (room_id, output)
+        cache = self._detect_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        event = self._match_event(output, room_id)
+        cache[key] = event
+        if len(cache) > self.DETECT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return event
+
+    def _match_event(self, output: str, room_id: int) -> Optional[RandomEvent]:
+        """Uncached body of check_for_event"""
+        # Most output matches no event: reject it with one regex pass
+        # instead of one search per event
+        dispatch = self._dispatch_regex()
+        if dispatch is not None and not dispatch.search(output):
+            return None
 
-            # Check pattern
-            if re.search(event.detection_pattern, output, re.IGNORECASE):
+        for event in self._events_for_room(room_id):
+            if event.compiled_pattern.search(output):
                 return event
 
         return None
 
+    def _events_for_room(self, room_id: int) -> Tuple[RandomEvent, ...]:
+        """
+        Events that can fire in room_id, in insertion order.
+
+        Room-scoped events are filtered once per room instead of on every
+        output line; the table is rebuilt after detection_changed.
+        """
+        events = self._room_events.get(room_id)
+        if events is None:
+            events = tuple(e for e in self.events.values()
+                           if not e.detection_rooms or room_id in e.detection_rooms)
+            self._room_events[room_id] = events
+        return events
+
     def detect_variance(self, run1: int, run2: int) -> List[VarianceRecord]:
         """Compare two runs to detect variance"""
         if run1 not in self.run_snapshots or run2 not in self.run_snapshots:
             return []
 
+        # Observations may be added to existing records below
+        self._structure_dirty = True
         variances = []
         snapshots1 = {s.room_id: s for s in self.run_snapshots[run1]}
         snapshots2 = {s.room_id: s for s in self.run_snapshots[run2]}
@@ -2870,11 +3274,15 @@ class RandomnessTracker:
             s1 = snapshots1[room_id]
             s2 = snapshots2[room_id]
 
-            # Compare object locations
-            all_objects = set(s1.object_locations.keys()) | set(s2.object_locations.keys())
-            for obj_id in all_objects:
-                loc1 = s1.object_locations.get(obj_id)
-                loc2 = s2.object_locations.get(obj_id)
+            # Compare object locations. The symmetric difference of the
+            # item views finds candidate objects in C; only those are
+            # re-checked, treating a missing entry as None like before.
+            locs1 = s1.object_locations
+            locs2 = s2.object_locations
+            changed = {obj_id for obj_id, _ in locs1.items() ^ locs2.items()}
+            for obj_id in sorted(changed):
+                loc1 = locs1.get(obj_id)
+                loc2 = locs2.get(obj_id)
 
                 if loc1 != loc2:
                     var_id = f"obj_{obj_id}_location"
@@ -2886,7 +3294,7 @@ class RandomnessTracker:
                         )
                         variance.add_observation(run1, loc1, f"room {room_id}")
                         variance.add_observation(run2, loc2, f"room {room_id}")
-                        self.variances[var_id] = variance
+                        self.add_variance(variance)
                         variances.append(variance)
                     else:
                         self.variances[var_id].add_observation(run2, loc2, f"room {room_id}")
@@ -2895,10 +3303,11 @@ class RandomnessTracker:
 
     def get_random_objects(self) -> List[int]:
         """Get list of object IDs that have random locations"""
-        return [
-            v.subject_id for v in self.variances.values()
-            if v.variance_type == "object_location" and v.subject_id is not None
-        ]
+        return list(self._random_objects)
+
+    def is_random_object(self, object_id: int) -> bool:
+        """Check if an object has random location variance"""
+        return object_id in self._random_objects
 
     def to_dict(self) -> dict:
         return {
@@ -2915,7 +3324,8 @@ class RandomnessTracker:
     def from_dict(cls, data: dict) -> "RandomnessTracker":
         tracker = cls()
         tracker.events = {k: RandomEvent.from_dict(v) for k, v in data.get("events", {}).items()}
-        tracker.variances = {k: VarianceRecord.from_dict(v) for k, v in data.get("variances", {}).items()}
+        for v in data.get("variances", {}).values():
+            tracker.add_variance(VarianceRecord.from_dict(v))
         tracker.run_snapshots = {
             int(k): [RunSnapshot.from_dict(s) for s in v]
             for k, v in data.get("run_snapshots", {}).items()
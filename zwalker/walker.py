@@ -5,9 +5,11 @@ Systematically explores a game by trying commands and mapping rooms.
 Optionally integrates with KnowledgeBase for persistent learning across runs.
 """
 
-from typing import Dict, List, Set, Optional, Tuple, Any, TYPE_CHECKING
+from typing import Dict, FrozenSet, List, Set, Optional, Tuple, Any, TYPE_CHECKING
 from dataclasses import dataclass, field
+from functools import lru_cache
 from .zmachine import ZMachine, GameState
+from ._util import slotted
 import re
 
 if TYPE_CHECKING:
@@ -60,6 +62,7 @@ class GameObject:
     taken: bool = False  # Have we picked it up?
 
 
+@slotted
 @dataclass
 class ExplorationResult:
     """Result of trying a command"""
@@ -103,6 +106,7 @@ DIRECTION_NORMALIZE = {
 }
 
 
+@lru_cache(maxsize=1024)
 def _normalize_direction(cmd: str) -> Optional[str]:
     """Return the canonical direction for a movement command, or None."""
     c = cmd.strip().lower()
@@ -132,6 +136,39 @@ BLOCKED_PATTERNS = [
     r"way is blocked",
 ]
 
+# BLOCKED_PATTERNS as one alternation, so _is_blocked scans output once
+BLOCKED_REGEX = re.compile("|".join(f"(?:{p})" for p in BLOCKED_PATTERNS),
+                           re.IGNORECASE)
+
+
+def _phrase_regex(phrases: List[str]):
+    """One case-insensitive regex matching any of phrases, so output is
+    scanned once without a lowercased copy."""
+    return re.compile("|".join(map(re.escape, phrases)), re.IGNORECASE)
+
+
+# Responses that mark a command "do not retry", with the reason recorded
+FAILURE_PATTERNS = [
+    ("don't understand", "parser didn't understand"),
+    ("can't see", "object not visible"),
+    ("can't do that", "action not possible"),
+    ("nothing happens", "no effect"),
+]
+FAILURE_REGEX = _phrase_regex([p for p, _ in FAILURE_PATTERNS])
+
+# Rejections that make an exploratory command's output not worth keeping,
+# per exploration strategy
+SINGLE_WORD_BORING_REGEX = _phrase_regex(
+    ["don't know", "don't understand", "can't see", "i beg your"])
+VERB_NOUN_BORING_REGEX = _phrase_regex([
+    "don't understand", "can't see", "can't do that",
+    "doesn't seem", "nothing happens", "that's not",
+    "you can't", "i don't"
+])
+AI_COMMAND_BORING_REGEX = _phrase_regex(
+    ["don't understand", "can't see", "i don't know"])
+UNTAKEABLE_REGEX = _phrase_regex(["can't take", "fixed"])
+
 # Patterns suggesting we've entered a new room
 NEW_ROOM_PATTERNS = [
     r"^[A-Z][A-Za-z\s,'-]+$",  # Room names are typically title case on their own line
@@ -155,7 +192,8 @@ class GameWalker:
         Initialize game walker.
 
         Args:
-            game_data: Raw bytes of the Z-machine game file
+            game_data: Raw bytes of the Z-machine game file; never
+                       modified, so may be shared
             knowledge_base: Optional KnowledgeBase for persistent learning.
                            If provided, all discoveries are recorded and
                            failed commands are skipped on retry.
@@ -169,6 +207,9 @@ class GameWalker:
 
         # Exploration state - room IDs are Z-machine object numbers
         self.rooms: Dict[int, Room] = {}
+        # Bumped whenever a room or exit in self.rooms changes; lets callers
+        # cache anything derived from the map (see AdvancedAISolver)
+        self.map_version: int = 0
         self.current_room_id: int = 0
 
         # State snapshots for backtracking
@@ -187,6 +228,10 @@ class GameWalker:
         # Output tracking
         self.full_transcript: List[Tuple[str, str]] = []  # (command, output)
 
+        # (room, inventory) state signatures reached this session; lets the
+        # explorers skip go-and-come-back probes into states already seen.
+        self.visited_states: Set[Tuple[int, FrozenSet[int]]] = set()
+
         # Room name detection
         self.known_room_names: Set[str] = set()
 
@@ -233,8 +278,10 @@ class GameWalker:
             state_snapshot=self.vm.save_state()
         )
         self.rooms[room_obj] = initial_room
+        self.map_version += 1
         self.current_room_id = room_obj
         self.known_room_names.add(room_name or "Starting Room")
+        self.visited_states.add(self.state_signature(room_obj))
 
         # Record in knowledge base
         if self.kb:
@@ -293,11 +340,7 @@ class GameWalker:
 
     def _is_blocked(self, output: str) -> bool:
         """Check if output indicates movement was blocked"""
-        output_lower = output.lower()
-        for pattern in BLOCKED_PATTERNS:
-            if re.search(pattern, output_lower):
-                return True
-        return False
+        return BLOCKED_REGEX.search(output) is not None
 
     def _detect_new_room(self, old_room: int) -> bool:
         """
@@ -337,6 +380,7 @@ class GameWalker:
             state_snapshot=self.vm.save_state()
         )
         self.rooms[room_obj] = new_room
+        self.map_version += 1
 
         if room_name:
             self.known_room_names.add(room_name)
@@ -497,13 +541,16 @@ class GameWalker:
             # Update current room's exits
             current_room = self.rooms[self.current_room_id]
             direction = DIR_ABBREV.get(command, command)
-            current_room.exits[direction] = result.room_id
+            if current_room.exits.get(direction) != result.room_id:
+                current_room.exits[direction] = result.room_id
+                self.map_version += 1
 
             # Update new room's exits (reverse direction)
             new_room = self.rooms[result.room_id]
             reverse = self._get_reverse_direction(command)
             if reverse and reverse not in new_room.exits:
                 new_room.exits[reverse] = self.current_room_id
+                self.map_version += 1
 
             # Record exit in knowledge base
             if self.kb:
@@ -512,6 +559,7 @@ class GameWalker:
                     self.kb.add_exit(result.room_id, reverse, self.current_room_id)
 
             self.current_room_id = result.room_id
+            self.visited_states.add(self.state_signature(result.room_id))
         elif norm_dir and self._is_blocked(output):
             # Room didn't change AND output indicates blocked movement.
             # IMPORTANT: only treat this as a blocked move (and roll the VM state
@@ -548,22 +596,18 @@ class GameWalker:
             elif len(output.strip()) > 50:
                 result.interesting = True
 
-            # Check for failure patterns to mark as "do not retry"
-            output_lower = output.lower()
-            failure_patterns = [
-                ("don't understand", "parser didn't understand"),
-                ("can't see", "object not visible"),
-                ("can't do that", "action not possible"),
-                ("nothing happens", "no effect"),
-            ]
-            for pattern, reason in failure_patterns:
-                if pattern in output_lower:
-                    result_type = "failure"
-                    if self.kb:
-                        self.kb.mark_failed_command(
-                            command, self.current_room_id, reason=reason
-                        )
-                    break
+            # Check for failure patterns to mark as "do not retry". One regex
+            # scan rules out the common case; the first listed match wins.
+            if FAILURE_REGEX.search(output):
+                output_lower = output.lower()
+                for pattern, reason in FAILURE_PATTERNS:
+                    if pattern in output_lower:
+                        result_type = "failure"
+                        if self.kb:
+                            self.kb.mark_failed_command(
+                                command, self.current_room_id, reason=reason
+                            )
+                        break
 
         # Detect puzzles from output
         if self.kb and result.blocked:
@@ -604,6 +648,62 @@ class GameWalker:
 
         return result
 
+    def try_commands(self, commands: List[str],
+                     skip_if_tried: bool = True) -> List[ExplorationResult]:
+        """Try a sequence of commands in order, returning one result each."""
+        try_command = self.try_command
+        return [try_command(cmd, skip_if_tried) for cmd in commands]
+
+    def state_signature(self, room_id: Optional[int] = None) -> Tuple[int, FrozenSet[int]]:
+        """(room, carried objects) key for visited states."""
+        if room_id is None:
+            room_id = self.current_room_id
+        return (room_id, frozenset(self.inventory))
+
+    def _known_exit_target(self, room_id: int, direction: str) -> Optional[int]:
+        """Destination of an exit already mapped by the walker or the KB."""
+        direction = DIR_ABBREV.get(direction, direction)
+        room = self.rooms.get(room_id)
+        if room and direction in room.exits:
+            return room.exits[direction]
+        if self.kb:
+            kb_room = self.kb.get_room(room_id)
+            if kb_room and direction in kb_room.exits:
+                return kb_room.exits[direction].destination_id
+        return None
+
+    def leads_to_visited_state(self, direction: str,
+                               room_id: Optional[int] = None) -> bool:
+        """
+        True if `direction` from `room_id` is a known exit whose destination
+        has already been reached with the current inventory, so probing it
+        (and walking back) would teach us nothing new.
+        """
+        if room_id is None:
+            room_id = self.current_room_id
+        target = self._known_exit_target(room_id, direction)
+        return target is not None and self.state_signature(target) in self.visited_states
+
+    def skip_visited_exit(self, direction: str,
+                          room_id: Optional[int] = None) -> bool:
+        """
+        If `direction` leads to an already-visited state, copy the known
+        exit onto the session map and mark the direction tried instead of
+        probing it. Returns True when the caller can skip the probe.
+        """
+        if room_id is None:
+            room_id = self.current_room_id
+        room = self.rooms.get(room_id)
+        if room is None or not self.leads_to_visited_state(direction, room_id):
+            return False
+        room.exits[DIR_ABBREV.get(direction, direction)] = \
+            self._known_exit_target(room_id, direction)
+        self.map_version += 1
+        norm_dir = _normalize_direction(direction)
+        if norm_dir:
+            room.tried_directions.add(norm_dir)
+        return True
+
     def explore_directions(self, room_id: Optional[int] = None) -> List[ExplorationResult]:
         """
         Explore all directions from a room.
@@ -620,15 +720,18 @@ class GameWalker:
 
         results = []
         for direction in DIRECTIONS[:12]:  # Full names
-            if direction not in self.rooms[room_id].exits:
-                result = self.try_command(direction)
-                results.append(result)
+            if direction in self.rooms[room_id].exits:
+                continue
+            if self.skip_visited_exit(direction, room_id):
+                continue
+            result = self.try_command(direction)
+            results.append(result)
 
-                if result.new_room:
-                    # Go back to explore more from original room
-                    reverse = self._get_reverse_direction(direction)
-                    if reverse:
-                        self.try_command(reverse)
+            if result.new_room:
+                # Go back to explore more from original room
+                reverse = self._get_reverse_direction(direction)
+                if reverse:
+                    self.try_command(reverse)
 
         return results
 
@@ -649,6 +752,8 @@ class GameWalker:
             room = self.rooms.get(room_id)
             if not room or direction in room.exits:
                 continue
+            if self.skip_visited_exit(direction, room_id):
+                continue
 
             # Go to this room if needed
             if self.current_room_id != room_id:
@@ -814,8 +919,7 @@ class GameWalker:
                     result_type="failure",
                 )
                 # Mark as do-not-retry if object can't be taken
-                output_lower = output.lower()
-                if "can't take" in output_lower or "fixed" in output_lower:
+                if UNTAKEABLE_REGEX.search(output):
                     self.kb.mark_failed_command(
                         cmd, self.current_room_id,
                         reason="object cannot be taken"
@@ -954,9 +1058,7 @@ class GameWalker:
                 self.vm.restore_state(state_before)
 
             # Check if output is interesting
-            output_lower = output.lower()
-            boring = ["don't know", "don't understand", "can't see", "i beg your"]
-            if not any(b in output_lower for b in boring):
+            if not SINGLE_WORD_BORING_REGEX.search(output):
                 if len(output.strip()) > 30:
                     result.interesting = True
 
@@ -1007,13 +1109,7 @@ class GameWalker:
                 self.inventory.extend(new_items)
 
             # Check for interesting output (not just error messages)
-            output_lower = output.lower()
-            boring_responses = [
-                "don't understand", "can't see", "can't do that",
-                "doesn't seem", "nothing happens", "that's not",
-                "you can't", "i don't"
-            ]
-            if not any(br in output_lower for br in boring_responses):
+            if not VERB_NOUN_BORING_REGEX.search(output):
                 if len(output.strip()) > 20:
                     result.interesting = True
 
@@ -1104,9 +1200,7 @@ class GameWalker:
                 result.interesting = True
             else:
                 # Check for interesting output
-                output_lower = output.lower()
-                boring = ["don't understand", "can't see", "i don't know"]
-                if not any(b in output_lower for b in boring):
+                if not AI_COMMAND_BORING_REGEX.search(output):
                     if len(output.strip()) > 30:
                         result.interesting = True
 
@@ -1573,9 +1667,9 @@ class GameWalker:
             GameWalker instance with KnowledgeBase attached
         """
         from .knowledge import KnowledgeBase
+        from ._story_cache import _load_story
 
-        with open(game_file, "rb") as f:
-            game_data = f.read()
+        game_data = _load_story(str(game_file))
 
         kb = KnowledgeBase(game_file, knowledge_dir)
 
@@ -7,9 +7,8 @@ designed for automated game exploration and testing.
 
 import os
 import struct
-import copy
 import random
-from typing import Optional, List, Tuple, Callable, Any
+from typing import Optional, Dict, List, Tuple, Callable, Any
 from dataclasses import dataclass, field
 
 
@@ -44,6 +43,11 @@ class CallFrame:
     stack_depth: int  # Stack depth at call time
     num_args: int = 0  # Number of arguments passed to this routine
 
+    def copy(self) -> "CallFrame":
+        """Shallow copy, as copy.copy would make but without its dispatch"""
+        return CallFrame(self.return_pc, self.locals, self.num_locals,
+                         self.store_var, self.stack_depth, self.num_args)
+
 
 @dataclass
 class GameState:
@@ -197,8 +201,13 @@ class ZMachine:
         # crash on, instead of silently absorbing them.
         self.strict = os.environ.get("ZWALKER_STRICT", "") not in ("", "0")
 
-        # I/O
-        self.output_buffer = ""
+        # I/O. Printed text is collected as a list of pieces and joined on
+        # read; appending to one str attribute recopies it on every print.
+        self._output_parts: List[str] = []
+
+        # Dictionary address for each word the player has typed. The main
+        # dictionary is in static memory, so entries never go stale.
+        self._word_entries: Dict[str, int] = {}
         self.input_callback: Optional[Callable[[str], str]] = None
         self.output_callback: Optional[Callable[[str], None]] = None
 
@@ -221,6 +230,8 @@ class ZMachine:
 
         # Player tracking - will be detected on first access
         self._player_object: Optional[int] = None
+        # (player, object entries, result) from the last get_inventory()
+        self._inventory_cache: Optional[Tuple[int, bytes, List[Tuple[int, str]]]] = None
         self._rooms_container: Optional[int] = None
 
         # UNDO support: snapshots taken by save_undo, restored by restore_undo.
@@ -1185,6 +1196,15 @@ class ZMachine:
         if player is None:
             return []
 
+        # The walk below only reads the entries of objects 1-255; reuse the
+        # last result while those bytes are unchanged
+        first = self._get_object_address(1)
+        entry_size = 9 if self.header.version <= 3 else 14
+        entries = bytes(self.memory[first:first + 255 * entry_size])
+        cached = self._inventory_cache
+        if cached is not None and cached[0] == player and cached[1] == entries:
+            return list(cached[2])
+
         inventory = []
         max_obj = 255 if self.header.version <= 3 else 2000
 
@@ -1194,7 +1214,8 @@ class ZMachine:
                 if name:
                     inventory.append((obj_num, name))
 
-        return inventory
+        self._inventory_cache = (player, entries, inventory)
+        return list(inventory)
 
     # Dictionary
     def get_dictionary_words(self) -> List[str]:
@@ -1360,10 +1381,11 @@ class ZMachine:
     def save_state(self) -> GameState:
         """Save complete game state"""
         return GameState(
-            memory=bytearray(self.memory[:self.header.static_memory]),
+            # Only dynamic memory can change; a bytearray slice is a copy
+            memory=self.memory[:self.header.static_memory],
             pc=self.pc,
             stack=list(self.stack),
-            call_stack=[copy.copy(f) for f in self.call_stack],
+            call_stack=[f.copy() for f in self.call_stack],
             locals=list(self.locals),
             random_state=self.rng.getstate(),
             waiting_for_input=self.waiting_for_input
@@ -1374,7 +1396,7 @@ class ZMachine:
         self.memory[:self.header.static_memory] = state.memory
         self.pc = state.pc
         self.stack = list(state.stack)
-        self.call_stack = [copy.copy(f) for f in state.call_stack]
+        self.call_stack = [f.copy() for f in state.call_stack]
         self.locals = list(state.locals)
         self.rng.setstate(state.random_state)
         self.waiting_for_input = state.waiting_for_input
@@ -1408,7 +1430,7 @@ class ZMachine:
             for ch in text:
                 buf.append(self.unicode_to_zscii(ch))
             return
-        self.output_buffer += text
+        self._output_parts.append(text)
         if self.output_callback:
             self.output_callback(text)
 
@@ -1897,8 +1919,95 @@ class ZMachine:
             # Get operand values normally
             ops = [self.get_operand(op) for op in operands]
 
-        # Execute opcode
-        if name == "rtrue":
+        # Execute opcode. The most frequently executed opcodes (by count on
+        # zork1) are tested first so the common case skips most of this
+        # chain; the rest keep spec order.
+        if name == "loadb":
+            addr = (ops[0] + ops[1]) & 0xFFFF
+            self.set_variable(store_var, self.read_byte(addr))
+
+        elif name == "storeb":
+            self.write_byte((ops[0] + ops[1]) & 0xFFFF, ops[2])
+
+        elif name == "jz":
+            self._do_branch(ops[0] == 0, branch)
+
+        elif name == "dec_chk":
+            # Use pre-computed indirect var num
+            var_num = indirect_var_num
+            # Now decrement and check
+            if var_num == 0:
+                # dec_chk sp: decrement top of stack in place
+                old_val = self.stack[-1] if self.stack else 0
+                val = self._signed(old_val) - 1
+                if self.stack:
+                    self.stack[-1] = val & 0xFFFF
+            else:
+                val = self._signed(self.get_variable(var_num)) - 1
+                self.set_variable(var_num, val & 0xFFFF)
+            self._do_branch(val < self._signed(ops[1]), branch)
+
+        elif name == "add":
+            self.set_variable(store_var, (self._signed(ops[0]) + self._signed(ops[1])) & 0xFFFF)
+
+        elif name == "je":
+            result = any(ops[0] == op for op in ops[1:])
+            self._do_branch(result, branch)
+
+        elif name == "loadw":
+            # Z-machine byte addresses are 16-bit; the computed address
+            # (array + 2*index) must wrap at 0x10000 rather than exceed it.
+            addr = (ops[0] + 2 * ops[1]) & 0xFFFF
+            self.set_variable(store_var, self.read_word(addr))
+
+        elif name == "store":
+            # Use pre-computed indirect var num
+            var_num = indirect_var_num
+            # Per spec: indirect reference to stack modifies top, not push
+            if var_num == 0:
+                if self.stack:
+                    self.stack[-1] = ops[1] & 0xFFFF
+                else:
+                    self.push(ops[1])
+            else:
+                self.set_variable(var_num, ops[1])
+
+        elif name == "storew":
+            # Z-machine byte addresses are 16-bit; wrap the computed address
+            # (array + 2*index) at 0x10000 instead of letting it overflow into
+            # high memory and trip the static-memory write guard.
+            self.write_word((ops[0] + 2 * ops[1]) & 0xFFFF, ops[2])
+
+        elif name == "mul":
+            self.set_variable(store_var, (self._signed(ops[0]) * self._signed(ops[1])) & 0xFFFF)
+
+        elif name == "call" or name == "call_vs":
+            args = ops[1:] if len(ops) > 1 else []
+            self._call_routine(ops[0], args, store_var)
+
+        elif name == "test_attr":
+            self._do_branch(self.get_attribute(ops[0], ops[1]), branch)
+
+        elif name == "inc_chk":
+            # Use pre-computed indirect var num
+            var_num = indirect_var_num
+            # Now increment and check
+            if var_num == 0:
+                # inc_chk sp: increment top of stack in place
+                old_val = self.stack[-1] if self.stack else 0
+                val = self._signed(old_val) + 1
+                if self.stack:
+                    self.stack[-1] = val & 0xFFFF
+            else:
+                val = self._signed(self.get_variable(var_num)) + 1
+                self.set_variable(var_num, val & 0xFFFF)
+            self._do_branch(val > self._signed(ops[1]), branch)
+
+        elif name == "jump":
+            offset = self._signed(ops[0])
+            self.pc = self.pc + offset - 2
+
+        elif name == "rtrue":
             self._return(1)
 
         elif name == "rfalse":
@@ -1949,9 +2058,6 @@ class ZMachine:
             self._do_branch(True, branch)  # Always succeed
 
         # 1OP
-        elif name == "jz":
-            self._do_branch(ops[0] == 0, branch)
-
         elif name == "get_sibling":
             sibling = self.get_object_sibling(ops[0])
             self.set_variable(store_var, sibling)
@@ -2007,10 +2113,6 @@ class ZMachine:
         elif name == "ret":
             self._return(ops[0])
 
-        elif name == "jump":
-            offset = self._signed(ops[0])
-            self.pc = self.pc + offset - 2
-
         elif name == "print_paddr":
             self.print_paddr(ops[0])
 
@@ -2032,46 +2134,12 @@ class ZMachine:
             self.set_variable(store_var, (~ops[0]) & 0xFFFF)
 
         # 2OP
-        elif name == "je":
-            result = any(ops[0] == op for op in ops[1:])
-            self._do_branch(result, branch)
-
         elif name == "jl":
             self._do_branch(self._signed(ops[0]) < self._signed(ops[1]), branch)
 
         elif name == "jg":
             self._do_branch(self._signed(ops[0]) > self._signed(ops[1]), branch)
 
-        elif name == "dec_chk":
-            # Use pre-computed indirect var num
-            var_num = indirect_var_num
-            # Now decrement and check
-            if var_num == 0:
-                # dec_chk sp: decrement top of stack in place
-                old_val = self.stack[-1] if self.stack else 0
-                val = self._signed(old_val) - 1
-                if self.stack:
-                    self.stack[-1] = val & 0xFFFF
-            else:
-                val = self._signed(self.get_variable(var_num)) - 1
-                self.set_variable(var_num, val & 0xFFFF)
-            self._do_branch(val < self._signed(ops[1]), branch)
-
-        elif name == "inc_chk":
-            # Use pre-computed indirect var num
-            var_num = indirect_var_num
-            # Now increment and check
-            if var_num == 0:
-                # inc_chk sp: increment top of stack in place
-                old_val = self.stack[-1] if self.stack else 0
-                val = self._signed(old_val) + 1
-                if self.stack:
-                    self.stack[-1] = val & 0xFFFF
-            else:
-                val = self._signed(self.get_variable(var_num)) + 1
-                self.set_variable(var_num, val & 0xFFFF)
-            self._do_branch(val > self._signed(ops[1]), branch)
-
         elif name == "jin":
             self._do_branch(self.get_object_parent(ops[0]) == ops[1], branch)
 
@@ -2084,40 +2152,15 @@ class ZMachine:
         elif name == "and":
             self.set_variable(store_var, ops[0] & ops[1])
 
-        elif name == "test_attr":
-            self._do_branch(self.get_attribute(ops[0], ops[1]), branch)
-
         elif name == "set_attr":
             self.set_attribute(ops[0], ops[1])
 
         elif name == "clear_attr":
             self.clear_attribute(ops[0], ops[1])
 
-        elif name == "store":
-            # Use pre-computed indirect var num
-            var_num = indirect_var_num
-            # Per spec: indirect reference to stack modifies top, not push
-            if var_num == 0:
-                if self.stack:
-                    self.stack[-1] = ops[1] & 0xFFFF
-                else:
-                    self.push(ops[1])
-            else:
-                self.set_variable(var_num, ops[1])
-
         elif name == "insert_obj":
             self.insert_object(ops[0], ops[1])
 
-        elif name == "loadw":
-            # Z-machine byte addresses are 16-bit; the computed address
-            # (array + 2*index) must wrap at 0x10000 rather than exceed it.
-            addr = (ops[0] + 2 * ops[1]) & 0xFFFF
-            self.set_variable(store_var, self.read_word(addr))
-
-        elif name == "loadb":
-            addr = (ops[0] + ops[1]) & 0xFFFF
-            self.set_variable(store_var, self.read_byte(addr))
-
         elif name == "get_prop":
             self.set_variable(store_var, self.get_property(ops[0], ops[1]))
 
@@ -2127,15 +2170,9 @@ class ZMachine:
         elif name == "get_next_prop":
             self.set_variable(store_var, self.get_next_property(ops[0], ops[1]))
 
-        elif name == "add":
-            self.set_variable(store_var, (self._signed(ops[0]) + self._signed(ops[1])) & 0xFFFF)
-
         elif name == "sub":
             self.set_variable(store_var, (self._signed(ops[0]) - self._signed(ops[1])) & 0xFFFF)
 
-        elif name == "mul":
-            self.set_variable(store_var, (self._signed(ops[0]) * self._signed(ops[1])) & 0xFFFF)
-
         elif name == "div":
             if ops[1] == 0:
                 raise ZMachineError("Division by zero")
@@ -2168,10 +2205,6 @@ class ZMachine:
             self._return(value)
 
         # VAR
-        elif name == "call" or name == "call_vs":
-            args = ops[1:] if len(ops) > 1 else []
-            self._call_routine(ops[0], args, store_var)
-
         elif name == "call_vs2":
             args = ops[1:] if len(ops) > 1 else []
             self._call_routine(ops[0], args, store_var)
@@ -2184,15 +2217,6 @@ class ZMachine:
             args = ops[1:] if len(ops) > 1 else []
             self._call_routine(ops[0], args, None)
 
-        elif name == "storew":
-            # Z-machine byte addresses are 16-bit; wrap the computed address
-            # (array + 2*index) at 0x10000 instead of letting it overflow into
-            # high memory and trip the static-memory write guard.
-            self.write_word((ops[0] + 2 * ops[1]) & 0xFFFF, ops[2])
-
-        elif name == "storeb":
-            self.write_byte((ops[0] + ops[1]) & 0xFFFF, ops[2])
-
         elif name == "put_prop":
             self.put_property(ops[0], ops[1], ops[2])
 
@@ -2569,9 +2593,13 @@ class ZMachine:
         self.write_byte(parse_buffer + 1, min(len(words), max_words))
 
         parse_addr = parse_buffer + 2
+        word_entries = self._word_entries
         for word, pos in words[:max_words]:
             # Look up word in dictionary
-            dict_entry = self._lookup_word(word, dict_addr, entry_len, abs(num_entries))
+            dict_entry = word_entries.get(word)
+            if dict_entry is None:
+                dict_entry = self._lookup_word(word, dict_addr, entry_len, abs(num_entries))
+                word_entries[word] = dict_entry
             self.write_word(parse_addr, dict_entry)
             self.write_byte(parse_addr + 2, len(word))
             if self.header.version <= 4:
@@ -2670,11 +2698,12 @@ class ZMachine:
     def run(self, max_steps: int = 1000000) -> None:
         """Run until input needed or finished"""
         self.running = True
-        steps = 0
-        while steps < max_steps:
-            if not self.step():
+        # step() returns False on the READ/quit that ends this run, so the
+        # loop needs no separate waiting_for_input poll.
+        step = self.step
+        for _ in range(max_steps):
+            if not step():
                 break
-            steps += 1
         self.running = False
 
     def send_input(self, text: str) -> None:
@@ -2684,6 +2713,19 @@ class ZMachine:
 
     def get_output(self) -> str:
         """Get and clear output buffer"""
-        output = self.output_buffer
-        self.output_buffer = ""
+        output = "".join(self._output_parts)
+        self._output_parts.clear()
         return output
+
+    @property
+    def output_buffer(self) -> str:
+        """Text printed since the last get_output()"""
+        parts = self._output_parts
+        if len(parts) > 1:
+            parts[:] = ["".join(parts)]
+        return parts[0] if parts else ""
+
+    @output_buffer.setter
+    def output_buffer(self, text: str) -> None:
+        # In place, so the list (and any bound append) is reused
+        self._output_parts[:] = [text] if text else []